@@ -0,0 +1,16 @@
+from typing import List
+
+import pytest
+from pytest_asyncio import is_async_test
+
+
+def pytest_collection_modifyitems(items: List[pytest.Item]) -> None:
+    """
+    Run every async test in a single, session-scoped event loop. Rebuilding the loop
+    per test would also throw away the http connection pools bound to it, i.e. the
+    ones of the cached RPC clients in `test_library.web3_utils`.
+    """
+    session_scope_marker = pytest.mark.asyncio(scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_scope_marker, append=False)
@@ -1,7 +1,11 @@
 import logging
+import re
+from time import time
+from typing import Tuple
 from uuid import uuid4
 
 import pytest
+import pytest_asyncio
 from infernet_node.test_delegate_subscription import (
     create_delegated_subscription,
     get_next_subscription_id,
@@ -14,22 +18,27 @@ log = logging.getLogger(__name__)
 
 CONSUMER_CONTRACT = "FailingSubscriptionConsumer"
 
+MAX_ATTEMPTS_EXCEEDED = "Subscription has exceeded the maximum number of attempts"
 
-@pytest.mark.asyncio
-@pytest.mark.flaky(reruns=2, reruns_delay=2)
-async def test_infernet_failing_subscription_must_retry_then_give_up() -> None:
+
+# The subscriptions are created in fixtures, rather than in the tests, so that a rerun
+# of a flaky test reuses them: pytest-rerunfailures only re-runs fixtures that failed.
+# The logs are then read from when the subscription was created, so lines emitted
+# before the rerun are not missed.
+
+
+@pytest_asyncio.fixture(scope="session")
+async def failing_subscription() -> Tuple[int, float]:
+    since = time()
     next_sub = await get_next_subscription_id()
     log.info(f"next_sub: {next_sub}")
     await create_sub_with_random_input(1, 5, contract_name=CONSUMER_CONTRACT)
+    return next_sub, since
 
-    await assert_regex_in_node_logs(
-        f"Subscription has exceeded the maximum number of attempts.*{next_sub}",
-        timeout=20,
-    )
 
-
-@pytest.mark.asyncio
-async def test_infernet_failing_delegated_subscription_must_retry_then_give_up() -> None:
+@pytest_asyncio.fixture(scope="session")
+async def failing_delegated_subscription() -> float:
+    since = time()
     await create_delegated_subscription(
         echo_input(f"{uuid4()}"),
         8,
@@ -37,7 +46,28 @@ async def test_infernet_failing_delegated_subscription_must_retry_then_give_up()
         contract_name=CONSUMER_CONTRACT,
         return_subscription_id=False,
     )
+    return since
 
+
+@pytest.mark.asyncio
+@pytest.mark.flaky(reruns=2, reruns_delay=2)
+async def test_infernet_failing_subscription_must_retry_then_give_up(
+    failing_subscription: Tuple[int, float],
+) -> None:
+    next_sub, since = failing_subscription
+
+    await assert_regex_in_node_logs(
+        re.compile(f"{MAX_ATTEMPTS_EXCEEDED}.*{next_sub}", re.IGNORECASE),
+        timeout=20,
+        since=since,
+    )
+
+
+@pytest.mark.asyncio
+async def test_infernet_failing_delegated_subscription_must_retry_then_give_up(
+    failing_delegated_subscription: float,
+) -> None:
     await assert_regex_in_node_logs(
-        "Subscription has exceeded the maximum number of attempts.*"
+        re.compile(MAX_ATTEMPTS_EXCEEDED, re.IGNORECASE),
+        since=failing_delegated_subscription,
     )
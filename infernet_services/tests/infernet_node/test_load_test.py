@@ -6,7 +6,6 @@ import asyncio
 import logging
 import os
 import random
-from uuid import uuid4
 
 import pytest
 from infernet_node.conftest import ECHO_SERVICE
@@ -19,7 +18,12 @@ from infernet_node.test_subscriptions import (
     assert_subscription_consumer_output,
     create_sub_with_random_input,
 )
-from test_library.web3_utils import echo_input, echo_output, request_web3_compute
+from test_library.web3_utils import (
+    echo_input,
+    echo_output,
+    request_web3_compute,
+    unique_input,
+)
 
 log = logging.getLogger(__name__)
 
@@ -28,13 +32,13 @@ TIMEOUT = 120
 
 
 async def _fire_callback() -> None:
-    i = f"{uuid4()}"
+    i = unique_input()
     sub_id = await request_web3_compute(ECHO_SERVICE, echo_input(i))
     await assert_output(sub_id, i, timeout=TIMEOUT)
 
 
 async def _fire_delegated() -> None:
-    i = f"{uuid4()}"
+    i = unique_input()
     sub_id = await create_delegated_subscription(echo_input(i), 10, 1)
     await assert_subscription_consumer_output(
         sub_id,
@@ -15,6 +15,7 @@ from test_library.web3_utils import (
     get_consumer_contract,
     get_rpc,
     get_sub_id_from_receipt,
+    unique_input,
 )
 from web3.contract import AsyncContract  # type: ignore
 from web3.exceptions import ContractLogicError
@@ -78,9 +79,9 @@ async def create_sub_with_random_input(
     verifier: str = ZERO_ADDRESS,
     contract_name: str = SUBSCRIPTION_CONSUMER_CONTRACT,
 ) -> tuple[int, str]:
-    # setting the input to a random number, this is to distinguish between the outputs
+    # setting the input to a unique value, this is to distinguish between the outputs
     # of different subscriptions
-    i = f"{uuid.uuid4()}"
+    i = unique_input()
 
     consumer = await get_subscription_consumer_contract(contract_name=contract_name)
 
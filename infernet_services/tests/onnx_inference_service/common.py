@@ -1,6 +1,7 @@
 from typing import Any, Dict
 
-from infernet_ml.utils.codec.vector import DataType
+from eth_abi.abi import encode
+from infernet_ml.utils.codec.vector import DataType, encode_vector
 from test_library.constants import ANVIL_NODE
 from torch import Tensor
 from web3 import AsyncHTTPProvider, AsyncWeb3
@@ -23,3 +24,12 @@ iris_input_vector_params: Any = {
     "shape": (1, 4),
     "dtype": DataType.float,
 }
+
+# the iris input vector & the web3 request for the preloaded iris models never change,
+# so they're encoded once here & shared across the web3 tests
+iris_input_vector: bytes = encode_vector(**iris_input_vector_params)
+
+iris_preloaded_web3_input: bytes = encode(
+    ["uint8", "string", "string", "string", "bytes"],
+    [0, "", "", "", iris_input_vector],
+)
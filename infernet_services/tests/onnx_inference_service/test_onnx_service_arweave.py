@@ -2,11 +2,10 @@ import logging
 
 import pytest
 from dotenv import load_dotenv
-from eth_abi.abi import encode
-from infernet_ml.utils.codec.vector import encode_vector
 from onnx_inference_service.common import (
     iris_classification_web2_assertions_fn,
     iris_input_vector_params,
+    iris_preloaded_web3_input,
 )
 from onnx_inference_service.conftest import ONNX_ARWEAVE_PRELOADED
 from test_library.web2_utils import get_job, request_job
@@ -42,18 +41,7 @@ async def test_basic_web2_inference_from_arweave_from_preloaded_model() -> None:
 async def test_basic_web3_inference_from_arweave_from_preloaded_model() -> None:
     sub_id = await request_web3_compute(
         ONNX_ARWEAVE_PRELOADED,
-        encode(
-            ["uint8", "string", "string", "string", "bytes"],
-            [
-                0,
-                "",
-                "",
-                "",
-                encode_vector(
-                    **iris_input_vector_params,
-                ),
-            ],
-        ),
+        iris_preloaded_web3_input,
     )
 
     await assert_generic_callback_consumer_output(sub_id, iris_web3_assertions)
@@ -3,10 +3,10 @@ import logging
 import pytest
 from dotenv import load_dotenv
 from eth_abi.abi import encode
-from infernet_ml.utils.codec.vector import encode_vector
 from infernet_ml.utils.model_loader import ModelSource
 from onnx_inference_service.common import (
     iris_classification_web2_assertions_fn,
+    iris_input_vector,
     iris_input_vector_params,
 )
 from onnx_inference_service.conftest import ONNX_SERVICE_NOT_PRELOADED, ONNX_WITH_PROOFS
@@ -93,9 +93,7 @@ async def test_basic_web3_inference_from_arweave() -> None:
                 ar_load_args["repo_id"],
                 ar_load_args["filename"],
                 "",
-                encode_vector(
-                    **iris_input_vector_params,
-                ),
+                iris_input_vector,
             ],
         ),
     )
@@ -140,9 +138,7 @@ async def test_basic_web3_inference_from_hf_hub() -> None:
                 hf_load_args["repo_id"],
                 hf_load_args["filename"],
                 "",
-                encode_vector(
-                    **iris_input_vector_params,
-                ),
+                iris_input_vector,
             ],
         ),
     )
@@ -1,15 +1,30 @@
 import json
+from typing import Optional, Pattern, Union
 
-from test_library.constants import NODE_LOG_CMD
-from test_library.log_collector import LogCollector
+from test_library.constants import NODE_LOG_CMD, NODE_LOG_SINCE_CMD
+from test_library.log_collector import LogCollector, compile_pattern
 
 
-async def assert_regex_in_node_logs(regex: str, timeout: int = 4) -> None:
-    collector = await LogCollector().start(NODE_LOG_CMD)
-    found, logs = await collector.wait_for_line(regex, timeout=timeout)
+async def assert_regex_in_node_logs(
+    regex: Union[str, Pattern[str]], timeout: int = 4, since: Optional[float] = None
+) -> None:
+    """
+    Asserts that a line matching `regex` shows up in the node's logs within
+    `timeout` seconds.
+
+    Args:
+        regex (Union[str, Pattern[str]]): The pattern to look for.
+        timeout (int, optional): The timeout in seconds. Defaults to 4.
+        since (Optional[float], optional): Unix timestamp to start reading the logs
+            from. Defaults to None, i.e. only lines logged from now on are matched.
+    """
+    pattern = compile_pattern(regex)
+    cmd = NODE_LOG_CMD if since is None else NODE_LOG_SINCE_CMD.format(since=since)
+    collector = await LogCollector().start(cmd)
+    found, logs = await collector.wait_for_line(pattern, timeout=timeout)
 
     assert found, (
-        f"Expected {regex} to exist in the output logs. Collected logs: "
+        f"Expected {pattern.pattern} to exist in the output logs. Collected logs: "
         f"{json.dumps(logs, indent=2)}"
     )
 
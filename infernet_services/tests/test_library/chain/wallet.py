@@ -56,9 +56,7 @@ async def fund_wallet_with_token(
 
 
 async def get_wallet_factory_contract(_address: Optional[str] = None) -> WalletFactory:
-    rpc = await get_rpc()
-    await rpc.initialize_with_private_key(global_config.tester_private_key)
-    return WalletFactory(global_config.wallet_factory, rpc)
+    return WalletFactory(global_config.wallet_factory, await get_rpc())
 
 
 async def create_wallet(_owner: Optional[ChecksumAddress] = None) -> InfernetWallet:
@@ -1,8 +1,10 @@
-import json
 import logging
 import os
+from copy import deepcopy
+from functools import lru_cache
 from typing import Any, Callable, Dict, List, Optional
 
+import orjson
 from eth_typing import ChecksumAddress
 from pydantic import BaseModel
 from test_library.constants import (
@@ -130,8 +132,8 @@ def create_config_file(
         rpc_url=rpc_url,
     )
 
-    with open(config_path(), "w") as f:
-        f.write(json.dumps(config_gen_hook(cfg), indent=4))
+    with open(config_path(), "wb") as f:
+        f.write(orjson.dumps(config_gen_hook(cfg), option=orjson.OPT_INDENT_2))
 
 
 def get_service_port(service_name: str) -> int:
@@ -146,12 +148,29 @@ def get_service_port(service_name: str) -> int:
     Returns:
         The port number
     """
-    with open(config_path(), "r") as f:
-        cfg = json.load(f)
-    for container in cfg["containers"]:
-        if container["id"] == service_name:
-            return int(container["port"])
-    raise ValueError(f"Service {service_name} not found in config file")
+    path = config_path()
+    ports = _load_port_index(path, os.path.getmtime(path))
+    if service_name not in ports:
+        raise ValueError(f"Service {service_name} not found in config file")
+    return ports[service_name]
+
+
+@lru_cache(maxsize=1)
+def _load_port_index(path: str, mtime: float) -> Dict[str, int]:
+    """
+    Index the containers' ports in the config file by their id. Cached on the file's
+    modification time, so re-generating the config file invalidates the index.
+
+    Args:
+        path: The path to the config file
+        mtime: The modification time of the config file
+
+    Returns:
+        A dictionary mapping service names to their ports
+    """
+    with open(path, "rb") as f:
+        cfg = orjson.loads(f.read())
+    return {c["id"]: int(c["port"]) for c in cfg["containers"]}
 
 
 def get_config(
@@ -176,10 +195,9 @@ def get_config(
         A dictionary representing the infernet config.json file
     """
 
-    cfg: Dict[str, Any] = base_config.copy()
-    cfg["containers"] = []
-    for service in services:
-        cfg["containers"].append(service.serialized)
+    # deep copy, so that the nested sections of base_config are never mutated
+    cfg: Dict[str, Any] = deepcopy(base_config)
+    cfg["containers"] = [service.serialized for service in services]
     cfg["chain"]["wallet"]["private_key"] = private_key
     cfg["chain"]["wallet"]["payment_address"] = payment_address
     cfg["chain"]["registry_address"] = registry_address
@@ -187,6 +205,7 @@ def get_config(
     return cfg
 
 
+@lru_cache(maxsize=1)
 def monorepo_dir() -> str:
     """
     Get the top level directory of the infernet monorepo.
@@ -200,6 +219,7 @@ def monorepo_dir() -> str:
     return top_level_dir
 
 
+@lru_cache(maxsize=1)
 def infernet_services_dir() -> str:
     """
     Get the path to the `infernet_services` directory under the infernet monorepo.
@@ -210,6 +230,7 @@ def infernet_services_dir() -> str:
     return os.path.join(monorepo_dir(), "infernet_services")
 
 
+@lru_cache(maxsize=1)
 def config_path() -> str:
     """
     Get the path to the config.json file under the `infernet_services/deploy` directory.
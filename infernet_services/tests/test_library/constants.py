@@ -54,6 +54,7 @@ DEFAULT_CONTRACT: str = "GenericCallbackConsumer"
 MAX_GAS_PRICE = int(20e9)
 MAX_GAS_LIMIT = 1_000_000
 NODE_LOG_CMD = "docker logs -n 0 -f infernet-node"
+NODE_LOG_SINCE_CMD = "docker logs --since {since} -f infernet-node"
 
 
 def hf_model_id(model_id: str) -> str:
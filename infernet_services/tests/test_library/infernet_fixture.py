@@ -1,11 +1,11 @@
 import asyncio
-import json
 import logging
 import os
 import shlex
 import subprocess
 from typing import Any, Callable, Dict, Generator, List, Optional
 
+import orjson
 from test_library.config_creator import (
     ServiceConfig,
     ServiceEnvVars,
@@ -42,8 +42,8 @@ def setup_logging() -> None:
 
 
 def stop_services() -> None:
-    with open(config_path(), "r") as f:
-        cfg = json.load(f)
+    with open(config_path(), "rb") as f:
+        cfg = orjson.loads(f.read())
     names = " ".join([service["id"] for service in cfg["containers"]])
     subprocess.run(shlex.split(f"docker kill {names}"))
     subprocess.run(shlex.split(f"docker rm {names}"))
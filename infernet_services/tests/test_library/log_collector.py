@@ -1,7 +1,33 @@
 import asyncio
+import contextlib
 import re
 from asyncio import StreamReader
-from typing import Any, List, Optional, Tuple, cast
+from functools import lru_cache
+from typing import Any, List, Optional, Pattern, Tuple, Union, cast
+
+
+@lru_cache(maxsize=128)
+def _compile(regex_pattern: str, regex_flags: Any) -> Pattern[str]:
+    return re.compile(regex_pattern, regex_flags)
+
+
+def compile_pattern(
+    regex_pattern: Union[str, Pattern[str]], regex_flags: Any = re.IGNORECASE
+) -> Pattern[str]:
+    """
+    Compiles a regex pattern, caching the result. Already-compiled patterns are
+    returned as-is, their own flags take precedence over `regex_flags`.
+
+    Args:
+        regex_pattern (Union[str, Pattern[str]]): The pattern to compile.
+        regex_flags (Any): The flags to compile the pattern with.
+
+    Returns:
+        Pattern[str]: The compiled pattern.
+    """
+    if isinstance(regex_pattern, re.Pattern):
+        return regex_pattern
+    return _compile(regex_pattern, regex_flags)
 
 
 class LogCollector:
@@ -9,8 +35,7 @@ class LogCollector:
         self.running = False
         self.logs: List[Tuple[str, str]] = []
         self.line_event: asyncio.Event = asyncio.Event()
-        self.regex_pattern: Optional[str] = None
-        self.regex_flags: Any = re.IGNORECASE
+        self.regex_pattern: Optional[Pattern[str]] = None
 
     async def start(self: "LogCollector", cmd: str) -> "LogCollector":
         self.running = True
@@ -30,9 +55,7 @@ class LogCollector:
                     break
                 decoded_line = line.decode().strip()
                 self.logs.append((tag, decoded_line))
-                if self.regex_pattern and re.search(
-                    self.regex_pattern, decoded_line, self.regex_flags
-                ):
+                if self.regex_pattern and self.regex_pattern.search(decoded_line):
                     self.line_event.set()
 
         tasks = [
@@ -54,16 +77,25 @@ class LogCollector:
                 await self.collect_task
             except asyncio.CancelledError:
                 pass
+        # `docker logs -f` never exits on its own, don't leave it tailing the node
+        if self.process.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                self.process.kill()
+            await self.process.wait()
 
     async def wait_for_line(
         self: "LogCollector",
-        regex_pattern: str,
+        regex_pattern: Union[str, Pattern[str]],
         regex_flags: Any = re.IGNORECASE,
         timeout: int = 10,
     ) -> Tuple[bool, List[Tuple[str, str]]]:
-        self.regex_pattern = regex_pattern
-        self.regex_flags = regex_flags
+        self.regex_pattern = compile_pattern(regex_pattern, regex_flags)
         self.line_event.clear()  # Clear the event for reuse
+        # New lines are matched as they stream in; only the ones collected before the
+        # pattern was set have to be scanned here.
+        if any(self.regex_pattern.search(line) for _, line in self.logs):
+            await self.stop()
+            return True, self.logs
         try:
             await asyncio.wait_for(self.line_event.wait(), timeout=timeout)
             return True, self.logs
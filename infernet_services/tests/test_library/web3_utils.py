@@ -1,13 +1,20 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import contextlib
+import itertools
 import logging
+import os
+import secrets
 import shlex
 import subprocess
-from typing import Any, Callable, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import orjson
 from eth_abi.abi import decode, encode
 from eth_abi.exceptions import InsufficientDataBytes
+from eth_account import Account
 from eth_typing import ChecksumAddress
 from hexbytes import HexBytes
 from infernet_client.chain.rpc import RPC
@@ -20,10 +27,11 @@ from test_library.constants import (
     DEFAULT_CONTRACT_FILENAME,
     DEFAULT_NODE_PRIVATE_KEY,
     DEFAULT_REGISTRY_ADDRESS,
+    DEFAULT_TESTER_PRIVATE_KEY,
     ZERO_ADDRESS,
 )
 from test_library.test_config import global_config
-from web3 import AsyncHTTPProvider, AsyncWeb3
+from web3 import AsyncWeb3
 from web3.contract import AsyncContract  # type: ignore
 from web3.exceptions import ContractLogicError
 from web3.types import ABI, LogReceipt, TxReceipt
@@ -40,8 +48,8 @@ def deploy_smart_contract(
     extra_params: Dict[str, str] = {},
 ) -> None:
     """
-    Deploys an infernet consumer contract to the chain. Uses the makefile script under
-    the hood.
+    Deploys an infernet consumer contract to the chain. Runs the `Deploy` forge script
+    of the `consumer-contracts` project under the hood.
 
     Args:
         filename (str, optional): The filename of the contract. Defaults to
@@ -55,17 +63,96 @@ def deploy_smart_contract(
         DEFAULT_COORDINATOR_ADDRESS.
 
     """
-    cmd = (
-        f"make deploy-contract filename={filename} "
-        f"contract={consumer_contract} sender={sender} "
-        f"rpc_url={rpc_url} registry={registry}"
+    log.info(f"deploying contract: {consumer_contract} from {filename}")
+    result = forge_script(
+        "Deploy",
+        "Deploy",
+        sender=sender,
+        rpc_url=rpc_url,
+        env={
+            "filename": filename,
+            "contract": consumer_contract,
+            "registry": registry,
+            **extra_params,
+        },
     )
+    if result.returncode != 0:
+        msg = (
+            f"Error deploying contract {consumer_contract}: {result}"
+            f"\n\nstdout:\n{result.stdout!r}\n\nstderr:\n{result.stderr!r}\n"
+        )
+        log.error(msg)
+        raise Exception(msg)
+
+
+# Whether the `consumer-contracts` project was built during this session
+_forge_built = False
 
-    for k, v in extra_params.items():
-        cmd += f" {k}={v}"
 
-    log.info(f"deploying contract: {cmd}")
-    subprocess.run(shlex.split(cmd))
+def forge_script(
+    script_name: str,
+    script_contract_name: str,
+    sender: str,
+    rpc_url: str,
+    env: Dict[str, str],
+) -> subprocess.CompletedProcess[bytes]:
+    """
+    Runs a forge script of the `consumer-contracts` foundry project. This mirrors the
+    project's `run-forge-script` make target, but invokes forge directly rather than
+    going through make, and only builds the project once per session rather than
+    before every script.
+
+    Args:
+        script_name (str): The script's name: i.e. `Deploy` for a `Deploy.s.sol` file.
+        script_contract_name (str): The script's contract name.
+        sender (str): The private key of the sender.
+        rpc_url (str): The RPC URL.
+        env (Dict[str, str]): Environment variables read by the script.
+
+    Returns:
+        subprocess.CompletedProcess[bytes]: The result of the forge invocation, or
+            of `forge build` if the build failed.
+    """
+    contracts_dir = os.path.join(infernet_services_dir(), "consumer-contracts")
+    deployments_dir = os.path.join(contracts_dir, "deployments")
+    os.makedirs(deployments_dir, exist_ok=True)
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(os.path.join(deployments_dir, "deployments.json"))
+
+    # scripts load the artifacts of contracts they don't import, i.e. the consumer
+    # contract being deployed, so those have to be built beforehand
+    global _forge_built
+    if not _forge_built:
+        log.info("running forge build")
+        build = subprocess.run(
+            ["forge", "build"], cwd=contracts_dir, capture_output=True
+        )
+        if build.returncode != 0:
+            return build
+        _forge_built = True
+
+    cmd = [
+        "forge",
+        "script",
+        f"script/{script_name}.s.sol:{script_contract_name}",
+        "--broadcast",
+        "--rpc-url",
+        rpc_url,
+    ]
+    log.info(f"running forge script: {shlex.join(cmd)}")
+
+    return subprocess.run(
+        cmd,
+        cwd=contracts_dir,
+        env={
+            **os.environ,
+            "registry": DEFAULT_REGISTRY_ADDRESS,
+            "signer": get_account_address(DEFAULT_TESTER_PRIVATE_KEY),
+            **env,
+            "PRIVATE_KEY": sender,
+        },
+        capture_output=True,
+    )
 
 
 def run_forge_script(
@@ -76,7 +163,7 @@ def run_forge_script(
     extra_params: Dict[str, str] = {},
 ) -> None:
     """
-    Runs a forge script. Uses the makefile script under the hood.
+    Runs a forge script. Retries up to 5 times if the script fails.
 
     Args:
         script_name (str): The script's name: i.e. `Deploy` for a `Deploy.s.sol` file.
@@ -86,17 +173,6 @@ def run_forge_script(
         rpc_url (str, optional): The RPC URL. Defaults to DEFAULT_INFERNET_RPC_URL.
         extra_params (Dict[str, str], optional): Extra parameters. Defaults to {}.
     """
-    cmd = (
-        f"make run-forge-script script_name={script_name} "
-        f"script_contract_name={script_contract_name} sender={sender} "
-        f"rpc_url={rpc_url}"
-    )
-
-    for k, v in extra_params.items():
-        cmd += f" {k}={v}"
-
-    log.info(f"Running script: {cmd}")
-
     results = []
 
     @retry(  # type: ignore
@@ -105,7 +181,13 @@ def run_forge_script(
         delay=0.1,
     )
     def _deploy() -> None:
-        result = subprocess.run(shlex.split(cmd), capture_output=True)
+        result = forge_script(
+            script_name,
+            script_contract_name,
+            sender=sender,
+            rpc_url=rpc_url,
+            env=extra_params,
+        )
         results.append(result)
         assert result.returncode == 0
 
@@ -113,7 +195,8 @@ def run_forge_script(
         _deploy()
     except AssertionError as e:
         result = results[-1]
-        msg = f"Error running forge script: command: {cmd}\n{result}"
+        msg = f"Error running forge script: {script_name}:{script_contract_name}"
+        msg += f"\n{result}"
         if result:
             msg += f"\n\nstdout:\n{result.stdout!r}\n\nstderr:\n{result.stderr!r}\n"
         log.error(msg)
@@ -135,11 +218,55 @@ def get_abi(filename: str, contract_name: str) -> ABI:
     Returns:
         ABIType: The ABI of the contract.
     """
-    with open(
+    _abi: ABI = _read_json(
         f"{infernet_services_dir()}/consumer-contracts/out/{filename}/{contract_name}.json"
-    ) as f:
-        _abi: ABI = json.load(f)["abi"]
-        return _abi
+    )["abi"]
+    return _abi
+
+
+# bounded, as every rebuild or redeploy adds an entry for the new mtime
+@lru_cache(maxsize=16)
+def _load_json(path: str, mtime: float) -> Any:
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def _read_json(path: str) -> Any:
+    """
+    Reads & parses a json file, caching the result. The cache is keyed on the file's
+    modification time, so re-building the contracts or re-deploying them invalidates
+    it. The returned object is shared between callers & must not be mutated.
+
+    Args:
+        path (str): Path to the json file.
+
+    Returns:
+        Any: The parsed json.
+    """
+    return _load_json(path, os.path.getmtime(path))
+
+
+# Polling schedule for consumer contract assertions: start fast to catch quick
+# results early, then back off (with a bit of jitter) to at most one query a second.
+_POLLING_BACKOFF: Dict[str, Any] = {
+    "delay": 0.1,
+    "backoff": 1.5,
+    "max_delay": 1.0,
+    "jitter": (0, 0.1),
+}
+
+
+def _polling_tries(timeout: float) -> int:
+    """
+    Number of tries needed for the `_POLLING_BACKOFF` schedule to span `timeout`
+    seconds. Jitter is ignored, so this errs on the side of polling for longer.
+    """
+    tries, elapsed, delay = 1, 0.0, _POLLING_BACKOFF["delay"]
+    while elapsed < timeout:
+        elapsed += delay
+        delay = min(delay * _POLLING_BACKOFF["backoff"], _POLLING_BACKOFF["max_delay"])
+        tries += 1
+    return tries
 
 
 async def assert_generic_callback_consumer_output(
@@ -165,7 +292,9 @@ async def assert_generic_callback_consumer_output(
         received_toggle = await consumer.functions.receivedToggle().call()
 
         @retry(  # type: ignore
-            exceptions=(AssertionError,), tries=timeout * 2, delay=1 / 2
+            exceptions=(AssertionError,),
+            tries=_polling_tries(timeout),
+            **_POLLING_BACKOFF,
         )
         async def _wait_till_next_output():
             assert await consumer.functions.receivedToggle().call() != received_toggle
@@ -176,14 +305,16 @@ async def assert_generic_callback_consumer_output(
 
     @retry(
         exceptions=(AssertionError, InsufficientDataBytes, ContractLogicError),
-        tries=timeout * 2,
-        delay=1 / 2,
+        tries=_polling_tries(timeout),
+        **_POLLING_BACKOFF,
     )  # type: ignore
     async def _assert(_sub_id: int) -> None:
         log.info(f"querying consumer contract for subscription id {_sub_id}")
-        _input = await consumer.functions.receivedInput(_sub_id).call()
-        _output = await consumer.functions.receivedOutput(_sub_id).call()
-        _proof = await consumer.functions.receivedProof(_sub_id).call()
+        _input, _output, _proof = await asyncio.gather(
+            consumer.functions.receivedInput(_sub_id).call(),
+            consumer.functions.receivedOutput(_sub_id).call(),
+            consumer.functions.receivedProof(_sub_id).call(),
+        )
         log.info(f"consumer contract call: {_input} {_output} {_proof}")
         assertions(_input, _output, _proof)
 
@@ -192,16 +323,18 @@ async def assert_generic_callback_consumer_output(
 
 def get_account_address(_private_key: Optional[str] = None) -> ChecksumAddress:
     private_key = _private_key or global_config.tester_private_key
-    w3 = AsyncWeb3(AsyncHTTPProvider(global_config.rpc_url))
-    account = w3.eth.account.from_key(private_key)
-    return AsyncWeb3.to_checksum_address(account.address)
+    return _account_address(private_key)
+
+
+@lru_cache(maxsize=None)
+def _account_address(private_key: str) -> ChecksumAddress:
+    return AsyncWeb3.to_checksum_address(Account.from_key(private_key).address)
 
 
 def get_deployed_contract_address(deployment_name: str) -> ChecksumAddress:
-    with open(
+    deployments = _read_json(
         f"{infernet_services_dir()}/consumer-contracts/deployments/deployments.json"
-    ) as f:
-        deployments = json.load(f)
+    )
     return AsyncWeb3.to_checksum_address(deployments[deployment_name])
 
 
@@ -298,7 +431,7 @@ async def request_web3_compute(
     tx = await global_config.tx_submitter.submit(fn)
 
     log.info(f"awaiting transaction {tx.hex()}")
-    receipt = await (await get_rpc()).get_tx_receipt(tx)
+    receipt = await consumer.w3.eth.wait_for_transaction_receipt(tx)
     return get_sub_id_from_receipt(receipt)
 
 
@@ -362,6 +495,19 @@ def deploy_smart_contract_with_sane_defaults(contract_name: str) -> None:
     )
 
 
+_input_prefix = secrets.token_hex(8)
+_input_counter = itertools.count()
+
+
+def unique_input() -> str:
+    """
+    Returns a string that is unique within (and, with overwhelming probability,
+    across) test sessions. Used to tell apart the outputs of different requests.
+    Cheaper than a uuid4, which needs a fresh read from `os.urandom` per call.
+    """
+    return f"{_input_prefix}-{next(_input_counter)}"
+
+
 def echo_input(_in: str, proof: str = "") -> bytes:
     """
     Creates an echo input, to be used with the echo service.
@@ -376,7 +522,22 @@ def echo_output(_in: str) -> bytes:
     return encode(["string"], [_in])
 
 
+_rpcs: Dict[Tuple[str, str], RPC] = {}
+_rpc_lock = asyncio.Lock()
+
+
 async def get_rpc() -> RPC:
-    return await RPC(global_config.rpc_url).initialize_with_private_key(
-        global_config.tester_private_key
-    )
+    """
+    Returns an RPC client for the global config's rpc url, initialized with the
+    tester's private key. Clients are cached per (rpc url, private key), so the
+    underlying web3 instance & its http session are reused across calls.
+
+    Returns:
+        RPC: The RPC client.
+    """
+    key = (global_config.rpc_url, global_config.tester_private_key)
+    if key not in _rpcs:
+        async with _rpc_lock:
+            if key not in _rpcs:
+                _rpcs[key] = await RPC(key[0]).initialize_with_private_key(key[1])
+    return _rpcs[key]
@@ -1,4 +1,5 @@
 import logging
+import re
 
 import pytest
 from eth_abi.abi import decode, encode
@@ -18,6 +19,8 @@ from test_library.web3_utils import (
 from tgi_client_inference_service.conftest import SERVICE_NAME, TGI_WITH_PROOFS
 from web3 import AsyncHTTPProvider, AsyncWeb3
 
+YES_OR_NO = re.compile("yes|no", re.IGNORECASE)
+
 w3 = AsyncWeb3(AsyncHTTPProvider(ANVIL_NODE))
 
 log = logging.getLogger(__name__)
@@ -84,7 +87,7 @@ async def test_tgi_client_inference_service_web2() -> None:
     )
     result: str = (await get_job(task, timeout=15))["output"]
 
-    assert any(x in result.lower() for x in ["yes", "no"])
+    assert YES_OR_NO.search(result), f"expected a yes/no answer, got: {result}"
 
 
 @pytest.mark.asyncio
@@ -97,7 +100,7 @@ async def test_tgi_client_streaming_request() -> None:
     )
     result = task.decode()
 
-    assert any(x in result.lower() for x in ["yes", "no"])
+    assert YES_OR_NO.search(result), f"expected a yes/no answer, got: {result}"
 
 
 @pytest.mark.asyncio
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Any, List
 
 from eth_abi.abi import encode
@@ -8,6 +9,72 @@ from eth_typing import ChecksumAddress
 from hexbytes import HexBytes
 from web3 import Web3
 
+# EIP-712 types for DelegateSubscription, these are static so we only build them once.
+# encode_typed_data() copies them before use, so sharing them across calls is safe.
+_EIP712_TYPES: dict[str, list[dict[str, str]]] = {
+    "EIP712Domain": [
+        {"name": "name", "type": "string"},
+        {"name": "version", "type": "string"},
+        {"name": "chainId", "type": "uint256"},
+        {"name": "verifyingContract", "type": "address"},
+    ],
+    "DelegateSubscription": [
+        {"name": "nonce", "type": "uint32"},
+        {"name": "expiry", "type": "uint32"},
+        {"name": "sub", "type": "Subscription"},
+    ],
+    "Subscription": [
+        {"name": "owner", "type": "address"},
+        {"name": "activeAt", "type": "uint32"},
+        {"name": "period", "type": "uint32"},
+        {"name": "frequency", "type": "uint32"},
+        {"name": "redundancy", "type": "uint16"},
+        {"name": "containerId", "type": "bytes32"},
+        {"name": "lazy", "type": "bool"},
+        {"name": "verifier", "type": "address"},
+        {"name": "paymentAmount", "type": "uint256"},
+        {"name": "paymentToken", "type": "address"},
+        {"name": "wallet", "type": "address"},
+    ],
+}
+
+_EIP712_DOMAIN_TEMPLATE: dict[str, Any] = {
+    "name": "InfernetCoordinator",
+    "version": "1",
+}
+
+
+@lru_cache(maxsize=64)
+def _get_domain(chain_id: int, verifying_contract: ChecksumAddress) -> dict[str, Any]:
+    """Returns the EIP-712 domain of the Infernet Coordinator
+
+    Args:
+        chain_id (int): Contract chain ID
+        verifying_contract (ChecksumAddress): EIP-712 signature verifying contract
+
+    Returns:
+        dict[str, Any]: EIP-712 domain
+    """
+    return {
+        **_EIP712_DOMAIN_TEMPLATE,
+        "chainId": chain_id,
+        "verifyingContract": verifying_contract,
+    }
+
+
+@lru_cache(maxsize=4096)
+def _hash_containers(containers: tuple[str, ...]) -> str:
+    """Returns keccak256 hash of comma-separated container IDs. Cached, since the
+    same container sets are typically reused across many subscriptions.
+
+    Args:
+        containers (tuple[str, ...]): Container IDs
+
+    Returns:
+        str: Hex-encoded hash
+    """
+    return Web3.keccak(encode(["string"], [",".join(containers)])).hex()
+
 
 class Subscription:
     """Infernet Coordinator subscription representation
@@ -36,6 +103,20 @@ class Subscription:
             made from
     """
 
+    __slots__ = (
+        "owner",
+        "_active_at",
+        "_period",
+        "_frequency",
+        "_redundancy",
+        "_containers_hash",
+        "_lazy",
+        "_verifier",
+        "_payment_amount",
+        "_payment_token",
+        "_wallet",
+    )
+
     def __init__(
         self,
         owner: str,
@@ -71,9 +152,7 @@ class Subscription:
         self._period = period
         self._frequency = frequency
         self._redundancy = redundancy
-        self._containers_hash = Web3.keccak(
-            encode(["string"], [",".join(containers)])
-        ).hex()
+        self._containers_hash = _hash_containers(tuple(containers))
         self._lazy = lazy
         self._verifier = verifier
         self._payment_amount = payment_amount
@@ -121,39 +200,9 @@ class Subscription:
         """
         return encode_typed_data(
             full_message={
-                "types": {
-                    "EIP712Domain": [
-                        {"name": "name", "type": "string"},
-                        {"name": "version", "type": "string"},
-                        {"name": "chainId", "type": "uint256"},
-                        {"name": "verifyingContract", "type": "address"},
-                    ],
-                    "DelegateSubscription": [
-                        {"name": "nonce", "type": "uint32"},
-                        {"name": "expiry", "type": "uint32"},
-                        {"name": "sub", "type": "Subscription"},
-                    ],
-                    "Subscription": [
-                        {"name": "owner", "type": "address"},
-                        {"name": "activeAt", "type": "uint32"},
-                        {"name": "period", "type": "uint32"},
-                        {"name": "frequency", "type": "uint32"},
-                        {"name": "redundancy", "type": "uint16"},
-                        {"name": "containerId", "type": "bytes32"},
-                        {"name": "lazy", "type": "bool"},
-                        {"name": "verifier", "type": "address"},
-                        {"name": "paymentAmount", "type": "uint256"},
-                        {"name": "paymentToken", "type": "address"},
-                        {"name": "wallet", "type": "address"},
-                    ],
-                },
+                "types": _EIP712_TYPES,
                 "primaryType": "DelegateSubscription",
-                "domain": {
-                    "name": "InfernetCoordinator",
-                    "version": "1",
-                    "chainId": chain_id,
-                    "verifyingContract": verifying_contract,
-                },
+                "domain": _get_domain(chain_id, verifying_contract),
                 "message": {
                     "nonce": nonce,
                     "expiry": expiry,
@@ -5,13 +5,35 @@ Currently, 3 APIs are supported: OPENAI, PERPLEXITYAI, and GOOSEAI.
 
 """
 
-import json
+import copy
+import hashlib
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union, cast
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
+import orjson
 import requests
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from infernet_ml.workflows.exceptions import (
     APIKeyMissingException,
@@ -19,6 +41,53 @@ from infernet_ml.workflows.exceptions import (
     RetryableException,
 )
 
+if TYPE_CHECKING:
+    from infernet_ml.utils.semantic_cache import SemanticCache
+
+# Shared session, so that consecutive requests to the same provider reuse pooled
+# keep-alive connections rather than paying for a new TCP/TLS handshake each time.
+# Rate limited & failed requests are retried by the adapter, on the same connection
+# and honoring `Retry-After`. Once those retries are exhausted, the last response is
+# returned as-is, and `check_status` raises a `RetryableException` for the callers
+# (see CSSInferenceWorkflow) to retry. Requests are POSTs, which aren't idempotent:
+# only failed connections & error statuses are retried, never a request that may
+# have reached the provider (read errors), as that could bill a completion twice.
+# statuses of responses the request can be retried on: rate limited or failed
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(
+        total=5,
+        read=0,
+        other=0,
+        backoff_factor=0.5,
+        status_forcelist=RETRYABLE_STATUS_CODES,
+        allowed_methods=frozenset({"GET", "HEAD", "POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    ),
+)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
+# (connect, read) timeouts, in seconds, of the requests made to the providers, so
+# that a stalled provider can't hang a worker. For streamed responses, the read
+# timeout bounds the wait for each chunk, the first one included, hence a longer one.
+CSS_REQUEST_TIMEOUT = (5, 60)
+CSS_STREAMING_TIMEOUT = (5, 120)
+
+# Session used to pre-warm connections, see `prewarm`. It never retries, so that an
+# unreachable provider fails fast, but shares `_ADAPTER`'s pool manager so that the
+# connections it opens are the ones `_SESSION` then reuses.
+_PREWARM_SESSION = requests.Session()
+_PREWARM_ADAPTER = HTTPAdapter(max_retries=Retry(0))
+_PREWARM_ADAPTER.poolmanager = _ADAPTER.poolmanager
+_PREWARM_SESSION.mount("https://", _PREWARM_ADAPTER)
+_PREWARM_SESSION.mount("http://", _PREWARM_ADAPTER)
+
 
 class ConvoMessage(BaseModel):
     """
@@ -39,6 +108,10 @@ class CSSCompletionParams(BaseModel):
     messages: list[ConvoMessage]
 
 
+# dumps a whole list of messages in one (compiled) call, rather than one per message
+_MESSAGES_ADAPTER: TypeAdapter[list[ConvoMessage]] = TypeAdapter(list[ConvoMessage])
+
+
 class CSSEmbeddingParams(BaseModel):
     """
     A CSS Embedding Param has an input string param.
@@ -93,6 +166,36 @@ class CSSRequest(BaseModel):
     extra_args: Optional[Dict[str, Any]] = None
 
 
+OPENAI_BASE_URL = "https://api.openai.com/v1/"
+PERPLEXITYAI_BASE_URL = "https://api.perplexity.ai/"
+GOOSEAI_BASE_URL = "https://api.goose.ai/v1/engines/"
+
+PROVIDER_BASE_URLS: dict[Provider, str] = {
+    Provider.OPENAI: OPENAI_BASE_URL,
+    Provider.PERPLEXITYAI: PERPLEXITYAI_BASE_URL,
+    Provider.GOOSEAI: GOOSEAI_BASE_URL,
+}
+
+# Timeout, in seconds, of the requests made to pre-warm connections
+PREWARM_TIMEOUT = 5
+
+
+def prewarm(providers: Iterable[Provider] = tuple(Provider)) -> None:
+    """
+    Opens a pooled connection to each of the given providers, so that the first
+    request to them doesn't pay for the TCP/TLS handshake. Failures are logged and
+    ignored, the connection is then simply opened by the first request instead.
+
+    Args:
+        providers: Iterable[Provider] Providers to connect to, defaults to all
+    """
+    for provider in providers:
+        try:
+            _PREWARM_SESSION.head(PROVIDER_BASE_URLS[provider], timeout=PREWARM_TIMEOUT)
+        except requests.RequestException as e:
+            logging.warning(f"could not pre-warm connection to {provider}: {e}")
+
+
 def open_ai_request_generator(req: CSSRequest) -> tuple[str, dict[str, Any]]:
     """Returns base url & json input for OpenAI API.
 
@@ -107,20 +210,18 @@ def open_ai_request_generator(req: CSSRequest) -> tuple[str, dict[str, Any]]:
     Raises:
         InfernetMLException: if an unsupported model or params specified.
     """
-    match req:
-        case CSSRequest(model=model_name, params=CSSCompletionParams(messages=msgs)):
-            return "https://api.openai.com/v1/", {
-                "model": model_name,
-                "messages": [msg.model_dump() for msg in msgs],
-            }
-
-        case CSSRequest(model=model_name, params=CSSEmbeddingParams(input=input)):
-            return "https://api.openai.com/v1/", {
-                "model": model_name,
-                "input": input,
-            }
-        case _:
-            raise InfernetMLException(f"Unsupported request {req}")
+    params = req.params
+    if isinstance(params, CSSCompletionParams):
+        return OPENAI_BASE_URL, {
+            "model": req.model,
+            "messages": _MESSAGES_ADAPTER.dump_python(params.messages),
+        }
+    if isinstance(params, CSSEmbeddingParams):
+        return OPENAI_BASE_URL, {
+            "model": req.model,
+            "input": params.input,
+        }
+    raise InfernetMLException(f"Unsupported request {req}")
 
 
 def perplexity_ai_request_generator(req: CSSRequest) -> tuple[str, dict[str, Any]]:
@@ -137,14 +238,13 @@ def perplexity_ai_request_generator(req: CSSRequest) -> tuple[str, dict[str, Any
     Raises:
         InfernetMLException: if an unsupported model or params specified.
     """
-    match req:
-        case CSSRequest(model=model_name, params=CSSCompletionParams(messages=msgs)):
-            return "https://api.perplexity.ai/", {
-                "model": model_name,
-                "messages": [msg.model_dump() for msg in msgs],
-            }
-        case _:
-            raise InfernetMLException(f"Unsupported request {req}")
+    params = req.params
+    if isinstance(params, CSSCompletionParams):
+        return PERPLEXITYAI_BASE_URL, {
+            "model": req.model,
+            "messages": _MESSAGES_ADAPTER.dump_python(params.messages),
+        }
+    raise InfernetMLException(f"Unsupported request {req}")
 
 
 def goose_ai_request_generator(req: CSSRequest) -> tuple[str, dict[str, Any]]:
@@ -162,16 +262,15 @@ def goose_ai_request_generator(req: CSSRequest) -> tuple[str, dict[str, Any]]:
     Raises:
         InfernetMLException: if an unsupported model or params specified.
     """
-    match req:
-        case CSSRequest(model=model_name, params=CSSCompletionParams(messages=msgs)):
-            if len(msgs) != 1:
-                raise InfernetMLException(
-                    "GOOSE AI API only accepts one message from role user!"
-                )
-            inp = msgs[0].content
-            return f"https://api.goose.ai/v1/engines/{model_name}/", {"prompt": inp}
-        case _:
-            raise InfernetMLException(f"Unsupported request {req}")
+    params = req.params
+    if isinstance(params, CSSCompletionParams):
+        msgs = params.messages
+        if len(msgs) != 1:
+            raise InfernetMLException(
+                "GOOSE AI API only accepts one message from role user!"
+            )
+        return f"{GOOSEAI_BASE_URL}{req.model}/", {"prompt": msgs[0].content}
+    raise InfernetMLException(f"Unsupported request {req}")
 
 
 def extract_completions(result: Dict[str, Any]) -> str:
@@ -182,6 +281,21 @@ def extract_completions_gooseai(result: Dict[str, Any]) -> str:
     return cast(str, result["choices"][0]["text"])
 
 
+def extract_embeddings(result: Dict[str, Any]) -> list[float]:
+    return cast(list[float], result["data"][0]["embedding"])
+
+
+def extract_streamed_completions(result: Dict[str, Any]) -> str:
+    return cast(str, result["choices"][0]["delta"].get("content", ""))
+
+
+streaming_post_processing: Dict[Provider, Callable[[Any], str]] = {
+    Provider.OPENAI: extract_streamed_completions,
+    Provider.PERPLEXITYAI: extract_streamed_completions,
+    Provider.GOOSEAI: extract_completions_gooseai,
+}
+
+
 PROVIDERS: dict[Provider, Any] = {
     Provider.OPENAI: {
         "input_func": open_ai_request_generator,
@@ -192,7 +306,7 @@ PROVIDERS: dict[Provider, Any] = {
             },
             "embeddings": {
                 "real_endpoint": "embeddings",
-                "post_process": lambda result: result["data"][0]["embedding"],
+                "post_process": extract_embeddings,
             },
         },
     },
@@ -217,6 +331,51 @@ PROVIDERS: dict[Provider, Any] = {
 }
 
 
+@dataclass(frozen=True, slots=True)
+class Route:
+    """
+    Everything needed to query a provider's endpoint, flattened out of `PROVIDERS`.
+
+    Attributes:
+        input_func: Returns the base url & json input of a request
+        real_endpoint: Path of the endpoint, relative to the base url
+        post_process: Extracts the output from the endpoint's response
+        stream_post_process: Extracts the output from a streamed response chunk
+    """
+
+    input_func: Callable[[CSSRequest], tuple[str, dict[str, Any]]]
+    real_endpoint: str
+    post_process: Callable[[Any], Any]
+    stream_post_process: Callable[[Any], str]
+
+
+# (provider, endpoint) -> Route, so that a request's route is a single dict lookup
+_ROUTES: dict[tuple[Provider, str], Route] = {
+    (provider, endpoint): Route(
+        input_func=config["input_func"],
+        real_endpoint=endpoint_config["real_endpoint"],
+        post_process=endpoint_config["post_process"],
+        stream_post_process=streaming_post_processing[provider],
+    )
+    for provider, config in PROVIDERS.items()
+    for endpoint, endpoint_config in config["endpoints"].items()
+}
+
+
+def get_route(req: CSSRequest) -> Route:
+    """
+    Returns the route of a validated request.
+
+    Args:
+        req: a CSSRequest object, containing provider, endpoint, model,
+        api keys & params.
+
+    Returns:
+        Route: the route of the request
+    """
+    return _ROUTES[(req.provider, req.endpoint)]
+
+
 def validate(req: CSSRequest) -> None:
     """helper function to validate provider and endpoint
 
@@ -228,18 +387,19 @@ def validate(req: CSSRequest) -> None:
         InfernetMLException: if API Key not specified or an unsupported
             provider or endpoint specified.
     """
-    if req.provider not in PROVIDERS:
-        raise InfernetMLException("Provider not supported!")
+    # a single lookup on the happy path, unsupported providers are told apart from
+    # unsupported endpoints only on failure
+    if (req.provider, req.endpoint) not in _ROUTES:
+        if req.provider not in PROVIDERS:
+            raise InfernetMLException("Provider not supported!")
+        raise InfernetMLException("Endpoint not supported for your provider!")
 
     if req.api_keys.get(req.provider) is None:
         raise APIKeyMissingException(f"{req.provider} API key not specified!")
 
-    if req.endpoint not in PROVIDERS[req.provider]["endpoints"]:
-        raise InfernetMLException("Endpoint not supported for your provider!")
-
 
 def get_request_configuration(
-    req: CSSRequest,
+    req: CSSRequest, route: Optional[Route] = None
 ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
     """
     Get the configuration for a given request.
@@ -247,24 +407,190 @@ def get_request_configuration(
     Args:
         req: a CSSRequest object, containing provider, endpoint, model,
         api keys & params.
+        route: the route of the request, looked up if not given
 
     Returns:
         configuration: dict[str, Any]
     """
-    provider = req.provider
-    api_key = req.api_keys[provider]
-    real_endpoint = PROVIDERS[provider]["endpoints"][req.endpoint]["real_endpoint"]
-    base_url, proc_input = PROVIDERS[provider]["input_func"](req)
-    url = f"{base_url}{real_endpoint}"
+    route = route or get_route(req)
+    base_url, proc_input = route.input_func(req)
+    url = f"{base_url}{route.real_endpoint}"
 
     headers = {
         "Content-Type": "application/json",
-        "Authorization": f"Bearer {api_key}",
+        "Authorization": f"Bearer {req.api_keys[req.provider]}",
     }
 
     return url, headers, {**proc_input, **(req.extra_args or {})}
 
 
+def check_status(provider: Provider, status_code: int, text: str) -> None:
+    """
+    Raise the appropriate exception for an unsuccessful response from a provider.
+
+    Args:
+        provider: Provider the response came from
+        status_code: HTTP status code of the response
+        text: body of the response
+
+    Raises:
+        RetryableException: if the request can be retried, i.e. it was rate limited
+            or failed with a status in `RETRYABLE_STATUS_CODES`
+        InfernetMLException: for any other unsuccessful response
+    """
+    if status_code == 200:
+        return
+
+    # https://help.openai.com/en/articles/6891839-api-error-code-guidance
+    if status_code in RETRYABLE_STATUS_CODES:
+        raise RetryableException(f"{provider}: {text}")
+    raise InfernetMLException(f"{provider}: {text}")
+
+
+# Exact-match response cache, disabled by default: completions are not deterministic
+# unless the request pins them down (i.e. `temperature=0`), so caching is opt-in.
+CSS_RESPONSE_CACHE_SIZE = int(os.getenv("CSS_RESPONSE_CACHE_SIZE", 0))
+CSS_RESPONSE_CACHE_TTL = int(os.getenv("CSS_RESPONSE_CACHE_TTL", 3600))
+
+# extra arguments that do not affect the response's content
+_UNCACHED_EXTRA_ARGS = ("stream", "user")
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of processed API responses, with a time-to-live.
+
+    Responses may be mutable, e.g. embeddings are lists of floats, so they are
+    copied in & out of the cache: callers never share a cached object.
+
+    Attributes:
+        maxsize: int Maximum number of cached responses, 0 disables the cache
+        ttl: int Time, in seconds, a response is cached for
+    """
+
+    def __init__(self, maxsize: int, ttl: int) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return copy.deepcopy(value)
+
+    def put(self, key: str, value: Any) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+def cache_key(req: CSSRequest) -> str:
+    """
+    Deterministic key for a request: a hash of everything that affects the
+    response. API keys & arguments in `_UNCACHED_EXTRA_ARGS` are left out.
+
+    Args:
+        req: a CSSRequest object, containing provider, endpoint, model,
+        api keys & params.
+
+    Returns:
+        str: hex-encoded SHA-256 hash
+    """
+    extra_args = {
+        k: v for k, v in (req.extra_args or {}).items() if k not in _UNCACHED_EXTRA_ARGS
+    }
+    key = orjson.dumps(
+        {
+            "provider": req.provider.value,
+            "model": req.model,
+            "endpoint": req.endpoint,
+            "params": req.params.model_dump(),
+            "extra": extra_args,
+        },
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.sha256(key).hexdigest()
+
+
+_RESPONSE_CACHE = ResponseCache(CSS_RESPONSE_CACHE_SIZE, CSS_RESPONSE_CACHE_TTL)
+
+# Optional semantic cache for completions, see `infernet_ml.utils.semantic_cache`
+_SEMANTIC_CACHE: Optional["SemanticCache"] = None
+
+
+def set_semantic_cache(cache: Optional["SemanticCache"]) -> None:
+    """
+    Sets (or, with None, unsets) the semantic cache used for completion requests.
+
+    Args:
+        cache: Optional[SemanticCache] The semantic cache to use
+    """
+    global _SEMANTIC_CACHE
+    _SEMANTIC_CACHE = cache
+
+
+def lookup_cached_response(
+    req: CSSRequest,
+) -> Tuple[Optional[Any], Callable[[Any], None]]:
+    """
+    Looks a request up in the exact-match cache and, for completions, in the
+    semantic cache. The semantic cache matches on the last message, among requests
+    that are otherwise identical.
+
+    Args:
+        req: a CSSRequest object, containing provider, endpoint, model,
+        api keys & params.
+
+    Returns:
+        Tuple[Optional[Any], Callable[[Any], None]]: The cached response (None on a
+            miss) & a function that caches the response to the request once fetched.
+    """
+    stores: List[Callable[[Any], None]] = []
+
+    def store(response: Any) -> None:
+        for _store in stores:
+            _store(response)
+
+    if _RESPONSE_CACHE.enabled:
+        key = cache_key(req)
+        if (cached := _RESPONSE_CACHE.get(key)) is not None:
+            return cached, store
+        stores.append(partial(_RESPONSE_CACHE.put, key))
+
+    semantic_cache = _SEMANTIC_CACHE
+    if (
+        semantic_cache is not None
+        and isinstance(req.params, CSSCompletionParams)
+        and req.params.messages
+    ):
+        *history, last = req.params.messages
+        scope = cache_key(
+            req.model_copy(update={"params": CSSCompletionParams(messages=history)})
+        )
+        embedding = semantic_cache.embed(last.content)
+        if (cached := semantic_cache.lookup(embedding, scope)) is not None:
+            store(cached)
+            return cached, store
+        stores.append(partial(semantic_cache.add, embedding, scope))
+
+    return None, store
+
+
 def css_mux(req: CSSRequest) -> str:
     """
     By this point, we've already validated the request, so we can proceed
@@ -276,35 +602,26 @@ def css_mux(req: CSSRequest) -> str:
     Returns:
         response: processed output from api
     """
-    url, headers, body = get_request_configuration(req)
+    cached, cache_response = lookup_cached_response(req)
+    if cached is not None:
+        logging.info(f"css mux cache hit: {cached}")
+        return cast(str, cached)
 
-    result = requests.post(url, headers=headers, json=body)
+    # resolved once, its post-processing is then applied right after the response
+    route = get_route(req)
+    url, headers, body = get_request_configuration(req, route)
 
-    if result.status_code != 200:
-        match req.provider:
-            case Provider.OPENAI | Provider.GOOSEAI:
-                # https://help.openai.com/en/articles/6891839-api-error-code-guidance
-                if result.status_code == 429 or result.status_code == 500:
-                    raise RetryableException(result.text)
-            case Provider.PERPLEXITYAI:
-                if result.status_code == 429:
-                    raise RetryableException(result.text)
-            case _:
-                raise InfernetMLException(result.text)
+    result = _SESSION.post(
+        url, headers=headers, data=orjson.dumps(body), timeout=CSS_REQUEST_TIMEOUT
+    )
 
-    response = result.json()
-    logging.info(f"css mux result: {response}")
-    post_proc = PROVIDERS[req.provider]["endpoints"][req.endpoint]["post_process"]
-    return cast(str, post_proc(response))
+    check_status(req.provider, result.status_code, result.text)
 
-
-streaming_post_processing: Dict[Provider, Callable[[Any], str]] = {
-    Provider.OPENAI: lambda result: result["choices"][0]["delta"].get("content", ""),
-    Provider.PERPLEXITYAI: lambda result: result["choices"][0]["delta"].get(
-        "content", ""
-    ),
-    Provider.GOOSEAI: lambda result: result["choices"][0]["text"],
-}
+    response = orjson.loads(result.content)
+    logging.info(f"css mux result: {response}")
+    output = route.post_process(response)
+    cache_response(output)
+    return cast(str, output)
 
 
 def css_streaming_mux(req: CSSRequest) -> Iterator[str]:
@@ -319,19 +636,23 @@ def css_streaming_mux(req: CSSRequest) -> Iterator[str]:
     """
     req.extra_args = req.extra_args or {}
     req.extra_args["stream"] = True
-    url, headers, body = get_request_configuration(req)
-
-    s = requests.Session()
-
-    with s.post(url, json=body, headers=headers, stream=True) as resp:
-        for data in resp.iter_lines():
-            decoded = data.decode()
-            if decoded.startswith("data:"):
-                rest = decoded[5:].strip()
-                if rest == "[DONE]":
-                    continue
-                post_processor = streaming_post_processing[req.provider]
-                chunk = post_processor(json.loads(rest))
-                yield chunk
-            else:
+    route = get_route(req)
+    url, headers, body = get_request_configuration(req, route)
+    post_processor = route.stream_post_process
+
+    with _SESSION.post(
+        url,
+        data=orjson.dumps(body),
+        headers=headers,
+        stream=True,
+        timeout=CSS_STREAMING_TIMEOUT,
+    ) as resp:
+        # lines are handled as bytes: only the json payloads need decoding, and
+        # orjson parses them straight from bytes
+        for line in resp.iter_lines():
+            if not line.startswith(b"data:"):
+                continue
+            rest = line[5:].strip()
+            if rest == b"[DONE]":
                 continue
+            yield post_processor(orjson.loads(rest))
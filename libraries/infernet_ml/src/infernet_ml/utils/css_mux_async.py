@@ -0,0 +1,162 @@
+"""
+Async counterparts of the closed source model functions in `css_mux`, for callers
+that issue many CSS requests concurrently.
+
+Requests are sent through a shared `httpx.AsyncClient`, so that in-flight requests
+to the same provider share pooled (HTTP/2) connections. The client is created on
+first use, and is bound to the event loop it is first used in: call
+`close_async_client()` on shutdown, or before switching event loops.
+
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator, Iterable, List, Optional, Sequence, cast
+
+import httpx
+import orjson
+
+from infernet_ml.utils.css_mux import (
+    PREWARM_TIMEOUT,
+    PROVIDER_BASE_URLS,
+    CSSRequest,
+    Provider,
+    check_status,
+    get_request_configuration,
+    get_route,
+    lookup_cached_response,
+)
+
+_ASYNC_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Returns the shared async http client, creating it if needed.
+
+    Returns:
+        httpx.AsyncClient: the shared client
+    """
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT.is_closed:
+        _ASYNC_CLIENT = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            http2=True,
+            timeout=30,
+        )
+    return _ASYNC_CLIENT
+
+
+async def close_async_client() -> None:
+    """
+    Closes the shared async http client, if one was created. A new client is
+    created on the next request.
+    """
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is not None:
+        await _ASYNC_CLIENT.aclose()
+        _ASYNC_CLIENT = None
+
+
+async def prewarm_async(providers: Iterable[Provider] = tuple(Provider)) -> None:
+    """
+    Async version of `prewarm`. Opens a connection of the shared async client to
+    each of the given providers, concurrently.
+
+    Args:
+        providers: Iterable[Provider] Providers to connect to, defaults to all
+    """
+    client = get_async_client()
+
+    async def _prewarm(provider: Provider) -> None:
+        try:
+            await client.head(PROVIDER_BASE_URLS[provider], timeout=PREWARM_TIMEOUT)
+        except httpx.HTTPError as e:
+            logging.warning(f"could not pre-warm connection to {provider}: {e}")
+
+    await asyncio.gather(*(_prewarm(provider) for provider in providers))
+
+
+async def css_mux_async(req: CSSRequest) -> str:
+    """
+    Async version of `css_mux`. By this point, we've already validated the request,
+    so we can proceed with the actual API call.
+
+    Args:
+        req: CSSRequest
+
+    Returns:
+        response: processed output from api
+    """
+    cached, cache_response = lookup_cached_response(req)
+    if cached is not None:
+        logging.info(f"css mux cache hit: {cached}")
+        return cast(str, cached)
+
+    route = get_route(req)
+    url, headers, body = get_request_configuration(req, route)
+
+    result = await get_async_client().post(
+        url, headers=headers, content=orjson.dumps(body)
+    )
+
+    check_status(req.provider, result.status_code, result.text)
+
+    response = orjson.loads(result.content)
+    logging.info(f"css mux result: {response}")
+    output = route.post_process(response)
+    cache_response(output)
+    return cast(str, output)
+
+
+async def css_mux_batch(
+    reqs: Sequence[CSSRequest], max_concurrency: int = 20
+) -> List[str]:
+    """
+    Make many closed-source model requests concurrently, i.e. for callers that
+    process a list of prompts. At most `max_concurrency` requests are in flight at
+    once, to stay within the providers' rate limits.
+
+    Args:
+        reqs: Sequence[CSSRequest] The requests to make
+        max_concurrency: int Maximum number of concurrent requests
+
+    Returns:
+        List[str]: processed outputs from api, in the order of `reqs`
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _css_mux(req: CSSRequest) -> str:
+        async with semaphore:
+            return await css_mux_async(req)
+
+    return await asyncio.gather(*(_css_mux(req) for req in reqs))
+
+
+async def css_streaming_mux_async(req: CSSRequest) -> AsyncIterator[str]:
+    """
+    Async version of `css_streaming_mux`. Make a streaming request to the respective
+    closed-source model provider.
+
+    Args:
+        req: CSSRequest
+
+    Returns:
+        AsyncIterator[str]: an async generator that yields the response in chunks
+    """
+    req.extra_args = req.extra_args or {}
+    req.extra_args["stream"] = True
+    route = get_route(req)
+    url, headers, body = get_request_configuration(req, route)
+    post_processor = route.stream_post_process
+
+    async with get_async_client().stream(
+        "POST", url, content=orjson.dumps(body), headers=headers
+    ) as resp:
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            rest = line[5:].strip()
+            if rest == "[DONE]":
+                continue
+            yield post_processor(orjson.loads(rest))
@@ -0,0 +1,145 @@
+"""
+Semantic cache for closed source model responses.
+
+Unlike the exact-match cache in `css_mux`, this also returns a cached response for
+prompts that are worded differently but mean the same thing: prompts are embedded,
+and a cached response is returned if the cosine similarity between the prompt's
+embedding and a cached one is above a threshold.
+
+Embedding is left to the caller, i.e. a locally-run sentence embedding model
+through the `ONNXInferenceWorkflow`. Example usage:
+
+```python
+from infernet_ml.utils import css_mux
+from infernet_ml.utils.semantic_cache import CacheConfig, SemanticCache
+
+css_mux.set_semantic_cache(
+    SemanticCache(embed=my_embedding_fn, config=CacheConfig(threshold=0.95))
+)
+```
+
+"""
+
+import threading
+import time
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+from pydantic import BaseModel
+
+EmbeddingFn = Callable[[str], Sequence[float]]
+Embedding = npt.NDArray[np.float32]
+
+
+class CacheConfig(BaseModel):
+    """
+    Configuration of a semantic cache.
+
+    Attributes:
+        threshold: float Minimum cosine similarity for a cached response to be used
+        ttl: int Time, in seconds, a response is cached for
+        max_entries: int Maximum number of cached responses, the oldest one is
+            evicted when full
+    """
+
+    threshold: float = 0.9
+    ttl: int = 3600
+    max_entries: int = 1000
+
+
+class SemanticCache:
+    """
+    Thread-safe cache of responses, looked up by embedding similarity.
+
+    Embeddings are L2-normalized & stored as the rows of a single matrix, so a
+    lookup is one matrix-vector product. Entries are scoped: a lookup only matches
+    entries added with the same scope, i.e. for the same model & conversation.
+    """
+
+    def __init__(self, embed: EmbeddingFn, config: Optional[CacheConfig] = None):
+        """
+        Args:
+            embed: EmbeddingFn Function returning the embedding of a prompt
+            config: Optional[CacheConfig] Configuration of the cache, defaults to
+                `CacheConfig()`
+
+        Raises:
+            ValueError: if `config.max_entries` is less than 1
+        """
+        config = config or CacheConfig()
+        if config.max_entries < 1:
+            raise ValueError(
+                f"max_entries must be at least 1, got {config.max_entries}"
+            )
+        self.config = config
+        self._embed = embed
+        self._lock = threading.Lock()
+        self._embeddings: Optional[Embedding] = None
+        self._scopes: List[Optional[str]] = [None] * config.max_entries
+        self._responses: List[Any] = [None] * config.max_entries
+        self._expires_at = np.full(config.max_entries, -np.inf)
+        self._next = 0
+
+    def embed(self, text: str) -> Embedding:
+        """
+        Returns the L2-normalized embedding of a prompt.
+
+        Args:
+            text: str The prompt
+
+        Returns:
+            Embedding: the normalized embedding
+        """
+        embedding = np.asarray(self._embed(text), dtype=np.float32).ravel()
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
+
+    def lookup(self, embedding: Embedding, scope: str) -> Optional[Any]:
+        """
+        Returns the response cached for the most similar embedding, if its similarity
+        is at least the configured threshold.
+
+        Args:
+            embedding: Embedding Normalized embedding, as returned by `embed()`
+            scope: str Scope of the lookup
+
+        Returns:
+            Optional[Any]: The cached response, or None on a miss
+        """
+        with self._lock:
+            if self._embeddings is None:
+                return None
+            scores = self._embeddings @ embedding
+            valid = self._expires_at > time.monotonic()
+            valid &= np.fromiter(
+                (s == scope for s in self._scopes), dtype=bool, count=len(valid)
+            )
+            if not valid.any():
+                return None
+            scores[~valid] = -np.inf
+            best = int(scores.argmax())
+            if scores[best] < self.config.threshold:
+                return None
+            return self._responses[best]
+
+    def add(self, embedding: Embedding, scope: str, response: Any) -> None:
+        """
+        Caches a response, evicting the oldest one if the cache is full.
+
+        Args:
+            embedding: Embedding Normalized embedding, as returned by `embed()`
+            scope: str Scope the response is valid in
+            response: Any The response to cache
+        """
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = np.zeros(
+                    (self.config.max_entries, embedding.shape[0]), dtype=np.float32
+                )
+            i = self._next
+            self._embeddings[i] = embedding
+            self._scopes[i] = scope
+            self._responses[i] = response
+            self._expires_at[i] = time.monotonic() + self.config.ttl
+            self._next = (i + 1) % self.config.max_entries
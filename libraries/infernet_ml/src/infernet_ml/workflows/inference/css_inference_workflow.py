@@ -32,6 +32,12 @@ are provided for your convenience.
     pip install "infernet-ml[css_inference]"
     ```
 
+## Connection Pre-warming
+
+`setup()` opens a connection to each provider you've passed an API key for, so that
+the first request doesn't pay for the TCP/TLS handshake. Outside of the workflow, use
+`css_mux.prewarm()` (or `css_mux_async.prewarm_async()`) at startup instead.
+
 ## Completions Example
 
 The following is an example of how to use the CSS Inference Workflow to make a request to the OpenAI's completions API.
@@ -156,6 +162,7 @@ from infernet_ml.utils.css_mux import (
     CSSRequest,
     css_mux,
     css_streaming_mux,
+    prewarm,
     validate,
 )
 from infernet_ml.workflows.inference.base_inference_workflow import (
@@ -190,8 +197,9 @@ class CSSInferenceWorkflow(BaseInferenceWorkflow):
 
     def do_setup(self) -> bool:
         """
-        no specific setup needed
+        Pre-warms connections to the providers we have API keys for.
         """
+        prewarm(provider for provider, key in self.api_keys.items() if key)
         return True
 
     def inference(self, input_data: CSSRequest) -> Any:
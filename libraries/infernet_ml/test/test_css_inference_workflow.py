@@ -4,11 +4,14 @@ simple test for a CSS Inference Workflow
 
 import logging
 import os
+import time
 from typing import Any
 
+import orjson
 import pytest
 from dotenv import load_dotenv
 
+from infernet_ml.utils import css_mux
 from infernet_ml.utils.css_mux import (
     ApiKeys,
     ConvoMessage,
@@ -16,8 +19,14 @@ from infernet_ml.utils.css_mux import (
     CSSEmbeddingParams,
     CSSRequest,
     Provider,
+    ResponseCache,
+)
+from infernet_ml.utils.semantic_cache import CacheConfig, SemanticCache
+from infernet_ml.workflows.exceptions import (
+    APIKeyMissingException,
+    InfernetMLException,
+    RetryableException,
 )
-from infernet_ml.workflows.exceptions import APIKeyMissingException
 from infernet_ml.workflows.inference.css_inference_workflow import CSSInferenceWorkflow
 
 api_keys: ApiKeys = {
@@ -210,3 +219,173 @@ def test_allow_more_configs() -> None:
     workflow.setup()
     res: str = workflow.inference(req)
     assert len(res.split(" ")) < 10
+
+
+def test_response_cache(mocker: Any) -> None:
+    mocker.patch.object(css_mux, "_RESPONSE_CACHE", ResponseCache(maxsize=8, ttl=60))
+    post_mock = mocker.patch.object(css_mux._SESSION, "post")
+    post_mock.return_value.status_code = 200
+    post_mock.return_value.content = orjson.dumps(
+        {"choices": [{"message": {"content": expected_response}}]}
+    )
+
+    def _request(content: str, **extra_args: Any) -> CSSRequest:
+        return CSSRequest(
+            provider=Provider.OPENAI,
+            endpoint="completions",
+            model="gpt-3.5-turbo-16k",
+            params=CSSCompletionParams(
+                messages=[ConvoMessage(role="user", content=content)]
+            ),
+            api_keys={Provider.OPENAI: "key"},
+            extra_args=extra_args,
+        )
+
+    assert css_mux.css_mux(_request(completion_prompt)) == expected_response
+    post_mock.assert_called_once()
+    assert post_mock.call_args.kwargs["timeout"] == css_mux.CSS_REQUEST_TIMEOUT
+
+    # api keys & the user argument do not affect the response
+    req = _request(completion_prompt, user="someone")
+    req.api_keys = {Provider.OPENAI: "another key"}
+    assert css_mux.css_mux(req) == expected_response
+    post_mock.assert_called_once()
+
+    # anything else does
+    css_mux.css_mux(_request(completion_prompt, temperature=0.5))
+    css_mux.css_mux(_request("what's 3 + 3?"))
+    assert post_mock.call_count == 3
+
+
+def test_response_cache_should_not_share_mutable_responses(mocker: Any) -> None:
+    mocker.patch.object(css_mux, "_RESPONSE_CACHE", ResponseCache(maxsize=8, ttl=60))
+    post_mock = mocker.patch.object(css_mux._SESSION, "post")
+    post_mock.return_value.status_code = 200
+    post_mock.return_value.content = orjson.dumps({"data": [{"embedding": [0.1, 0.2]}]})
+
+    req = CSSRequest(
+        provider=Provider.OPENAI,
+        endpoint="embeddings",
+        model="text-embedding-3-small",
+        params=CSSEmbeddingParams(input="hello"),
+        api_keys={Provider.OPENAI: "key"},
+    )
+    # typed as str, but embeddings are post-processed to a list of floats
+    first: Any = css_mux.css_mux(req)
+    first.append(0.3)
+    second: Any = css_mux.css_mux(req)
+    second[0] = 1.0
+
+    third: Any = css_mux.css_mux(req)
+    assert third == [0.1, 0.2]
+    post_mock.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "provider, status_code, exception",
+    [
+        (Provider.OPENAI, 429, RetryableException),
+        (Provider.OPENAI, 502, RetryableException),
+        (Provider.PERPLEXITYAI, 500, RetryableException),
+        (Provider.GOOSEAI, 504, RetryableException),
+        (Provider.OPENAI, 400, InfernetMLException),
+        (Provider.PERPLEXITYAI, 401, InfernetMLException),
+    ],
+)
+def test_css_mux_should_raise_on_unsuccessful_responses(
+    mocker: Any, provider: Provider, status_code: int, exception: type[Exception]
+) -> None:
+    post_mock = mocker.patch.object(css_mux._SESSION, "post")
+    post_mock.return_value.status_code = status_code
+    post_mock.return_value.text = "<html>error</html>"
+
+    req = CSSRequest(
+        provider=provider,
+        endpoint="completions",
+        model="gpt-3.5-turbo-16k",
+        params=CSSCompletionParams(
+            messages=[ConvoMessage(role="user", content=completion_prompt)]
+        ),
+        api_keys={provider: "key"},
+    )
+    with pytest.raises(exception):
+        css_mux.css_mux(req)
+
+
+def test_css_streaming_mux_should_time_out(mocker: Any) -> None:
+    post_mock = mocker.patch.object(css_mux._SESSION, "post")
+    post_mock.return_value.__enter__.return_value.iter_lines.return_value = [
+        b'data: {"choices": [{"delta": {"content": "4"}}]}',
+        b"data: [DONE]",
+    ]
+
+    req = CSSRequest(
+        provider=Provider.OPENAI,
+        endpoint="completions",
+        model="gpt-3.5-turbo-16k",
+        params=CSSCompletionParams(
+            messages=[ConvoMessage(role="user", content=completion_prompt)]
+        ),
+        api_keys={Provider.OPENAI: "key"},
+    )
+    assert list(css_mux.css_streaming_mux(req)) == [expected_response]
+    assert post_mock.call_args.kwargs["timeout"] == css_mux.CSS_STREAMING_TIMEOUT
+
+
+def test_semantic_cache(mocker: Any) -> None:
+    vocabulary = ["2", "3", "plus"]
+
+    def _embed(text: str) -> list[float]:
+        words = text.lower().replace("+", " plus ").replace("?", " ").split()
+        return [float(w in words) for w in vocabulary]
+
+    mocker.patch.object(
+        css_mux, "_SEMANTIC_CACHE", SemanticCache(_embed, CacheConfig(threshold=0.8))
+    )
+    post_mock = mocker.patch.object(css_mux._SESSION, "post")
+    post_mock.return_value.status_code = 200
+    post_mock.return_value.content = orjson.dumps(
+        {"choices": [{"message": {"content": expected_response}}]}
+    )
+
+    def _request(*contents: str) -> CSSRequest:
+        return CSSRequest(
+            provider=Provider.OPENAI,
+            endpoint="completions",
+            model="gpt-3.5-turbo-16k",
+            params=CSSCompletionParams(
+                messages=[ConvoMessage(role="user", content=c) for c in contents]
+            ),
+            api_keys={Provider.OPENAI: "key"},
+        )
+
+    assert css_mux.css_mux(_request("what is 2 plus 2?")) == expected_response
+    assert css_mux.css_mux(_request("what's 2 + 2?")) == expected_response
+    post_mock.assert_called_once()
+
+    # different prompt, or same prompt in a different conversation
+    css_mux.css_mux(_request("what is 3 plus 3?"))
+    css_mux.css_mux(_request("hi", "what is 2 plus 2?"))
+    assert post_mock.call_count == 3
+
+
+def test_semantic_cache_should_error_if_no_entries() -> None:
+    with pytest.raises(ValueError):
+        SemanticCache(lambda text: [1.0], CacheConfig(max_entries=0))
+
+
+def test_semantic_caches_should_not_share_default_config() -> None:
+    cache, other = SemanticCache(lambda text: [1.0]), SemanticCache(lambda text: [1.0])
+    assert cache.config == CacheConfig()
+    assert cache.config is not other.config
+
+
+def test_prewarm_should_not_block_on_unreachable_providers(mocker: Any) -> None:
+    # nothing listens on the discard port, connections are refused
+    mocker.patch.dict(
+        css_mux.PROVIDER_BASE_URLS, {p: "http://127.0.0.1:9/" for p in Provider}
+    )
+    start = time.monotonic()
+    css_mux.prewarm()
+    # connections are not retried, with backoff, when pre-warming
+    assert time.monotonic() - start < 1
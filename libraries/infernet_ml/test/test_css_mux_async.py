@@ -0,0 +1,216 @@
+"""
+tests for the async CSS functions, against a mocked transport
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Coroutine, Iterator, Union
+
+import httpx
+import orjson
+import pytest
+
+from infernet_ml.utils import css_mux
+from infernet_ml.utils import css_mux_async as mux_async
+from infernet_ml.utils.css_mux import (
+    ConvoMessage,
+    CSSCompletionParams,
+    CSSEmbeddingParams,
+    CSSRequest,
+    Provider,
+)
+from infernet_ml.utils.css_mux_async import (
+    close_async_client,
+    css_mux_async,
+    css_mux_batch,
+    css_streaming_mux_async,
+    get_async_client,
+    prewarm_async,
+)
+
+# sync or async function handling a request sent to the mocked transport
+Handler = Union[
+    Callable[[httpx.Request], httpx.Response],
+    Callable[[httpx.Request], Coroutine[None, None, httpx.Response]],
+]
+
+
+@pytest.fixture
+def mock_client(mocker: Any) -> Iterator[Callable[[Handler], None]]:
+    """
+    Replaces the shared async client with one that sends requests to a handler.
+    """
+
+    def _mock(handler: Handler) -> None:
+        mocker.patch.object(
+            mux_async,
+            "_ASYNC_CLIENT",
+            httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+
+    yield _mock
+
+
+def _completion_request(content: str, **extra_args: Any) -> CSSRequest:
+    return CSSRequest(
+        provider=Provider.OPENAI,
+        endpoint="completions",
+        model="gpt-3.5-turbo-16k",
+        params=CSSCompletionParams(
+            messages=[ConvoMessage(role="user", content=content)]
+        ),
+        api_keys={Provider.OPENAI: "key"},
+        extra_args=extra_args,
+    )
+
+
+def test_css_mux_async_completion(mock_client: Callable[[Handler], None]) -> None:
+    requests: list[httpx.Request] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200, content=orjson.dumps({"choices": [{"message": {"content": "4"}}]})
+        )
+
+    mock_client(_handler)
+
+    req = _completion_request("what's 2 + 2?", temperature=0)
+    assert asyncio.run(css_mux_async(req)) == "4"
+
+    [request] = requests
+    assert str(request.url) == "https://api.openai.com/v1/chat/completions"
+    assert request.headers["Authorization"] == "Bearer key"
+    assert orjson.loads(request.content) == {
+        "model": "gpt-3.5-turbo-16k",
+        "messages": [{"role": "user", "content": "what's 2 + 2?"}],
+        "temperature": 0,
+    }
+
+
+def test_css_mux_async_embedding(mock_client: Callable[[Handler], None]) -> None:
+    requests: list[httpx.Request] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200, content=orjson.dumps({"data": [{"embedding": [0.1, 0.2]}]})
+        )
+
+    mock_client(_handler)
+
+    req = CSSRequest(
+        provider=Provider.OPENAI,
+        endpoint="embeddings",
+        model="text-embedding-3-small",
+        params=CSSEmbeddingParams(input="hello"),
+        api_keys={Provider.OPENAI: "key"},
+    )
+    # typed as str, but embeddings are post-processed to a list of floats
+    embedding: Any = asyncio.run(css_mux_async(req))
+    assert embedding == [0.1, 0.2]
+
+    [request] = requests
+    assert str(request.url) == "https://api.openai.com/v1/embeddings"
+    assert orjson.loads(request.content) == {
+        "model": "text-embedding-3-small",
+        "input": "hello",
+    }
+
+
+def test_css_streaming_mux_async(mock_client: Callable[[Handler], None]) -> None:
+    requests: list[httpx.Request] = []
+
+    def _chunk(content: str) -> bytes:
+        return orjson.dumps({"choices": [{"delta": {"content": content}}]})
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200,
+            content=b"\n".join(
+                [
+                    b": keep-alive",
+                    b"data: " + _chunk("2 + 2"),
+                    b"",
+                    b"data:" + _chunk(" is 4"),
+                    b"data: [DONE]",
+                ]
+            ),
+        )
+
+    mock_client(_handler)
+
+    async def _stream() -> list[str]:
+        req = _completion_request("what's 2 + 2?")
+        return [chunk async for chunk in css_streaming_mux_async(req)]
+
+    assert asyncio.run(_stream()) == ["2 + 2", " is 4"]
+
+    [request] = requests
+    assert orjson.loads(request.content)["stream"] is True
+
+
+def test_css_mux_batch(mock_client: Callable[[Handler], None]) -> None:
+    in_flight, max_in_flight = 0, 0
+
+    async def _handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        content = orjson.loads(request.content)["messages"][0]["content"]
+        # later requests complete first, so completion order != request order
+        await asyncio.sleep(0.01 / (1 + int(content)))
+        in_flight -= 1
+        return httpx.Response(
+            200,
+            content=orjson.dumps({"choices": [{"message": {"content": content}}]}),
+        )
+
+    mock_client(_handler)
+
+    reqs = [_completion_request(str(i)) for i in range(20)]
+    results = asyncio.run(css_mux_batch(reqs, max_concurrency=4))
+
+    assert results == [str(i) for i in range(20)]
+    assert max_in_flight == 4
+
+
+def test_async_client_is_reused_until_closed(mocker: Any) -> None:
+    mocker.patch.object(mux_async, "_ASYNC_CLIENT", None)
+
+    async def _run() -> None:
+        client = get_async_client()
+        assert get_async_client() is client
+
+        await close_async_client()
+        assert client.is_closed
+        assert mux_async._ASYNC_CLIENT is None
+
+        # a new client is created on the next use
+        new_client = get_async_client()
+        assert new_client is not client
+        await close_async_client()
+
+        # closing without a client is a no-op
+        await close_async_client()
+
+    asyncio.run(_run())
+
+
+def test_prewarm_async_should_not_block_on_unreachable_providers(mocker: Any) -> None:
+    mocker.patch.object(mux_async, "_ASYNC_CLIENT", None)
+    # nothing listens on the discard port, connections are refused
+    mocker.patch.dict(
+        css_mux.PROVIDER_BASE_URLS, {p: "http://127.0.0.1:9/" for p in Provider}
+    )
+
+    async def _run() -> None:
+        try:
+            await prewarm_async()
+        finally:
+            await close_async_client()
+
+    start = time.monotonic()
+    asyncio.run(_run())
+    assert time.monotonic() - start < 1
@@ -93,17 +93,25 @@ all_model_args = [
 ]
 
 
+@pytest.fixture(scope="module")
+def preloaded_workflow(request: pytest.FixtureRequest) -> TorchInferenceWorkflow:
+    # set up once per model
+    wf = TorchInferenceWorkflow(**request.param)
+    wf.setup()
+    return wf
+
+
 @pytest.mark.parametrize(
-    "model_kwargs, inference_input, assertions",
+    "preloaded_workflow, inference_input, assertions",
     all_model_args,
+    indirect=["preloaded_workflow"],
 )
 def test_inference_preloaded_models(
-    model_kwargs: dict[str, Any],
+    preloaded_workflow: TorchInferenceWorkflow,
     inference_input: TensorInput,
     assertions: AssertionType,
 ) -> None:
-    wf = TorchInferenceWorkflow(**model_kwargs).setup()
-    r = wf.inference(
+    r = preloaded_workflow.inference(
         TorchInferenceInput(
             input=inference_input,
         )
@@ -4,13 +4,26 @@ as check if a file exists on Arweave.
 """
 
 import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable
-
-import requests
-from ar import DEFAULT_API_URL, Peer, Transaction, Wallet  # type: ignore
+from typing import Any, BinaryIO, Callable
+
+from ar import (  # type: ignore
+    DEFAULT_API_URL,
+    ArweaveNetworkException,
+    Peer,
+    Transaction,
+    Wallet,
+)
 from ar.utils import b64dec  # type: ignore
-from ar.utils.transaction_uploader import get_uploader  # type: ignore
+from ar.utils.merkle import validate_path  # type: ignore
+from ar.utils.transaction_uploader import (  # type: ignore
+    TransactionUploaderException,
+    get_uploader,
+)
 from ritual_arweave.utils import (
     MAX_NODE_BYTES,
     get_sha256_digest,
@@ -20,6 +33,45 @@ from ritual_arweave.utils import (
 from ritual_arweave.utils import log as default_logger
 from tqdm import tqdm
 
+# Size of the pieces downloads are streamed to disk in
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Arweave data is split into chunks of (at most) 256 KiB
+ARWEAVE_CHUNK_SIZE = 256 * 1024
+
+# Number of chunks fetched concurrently when downloading a file in chunks
+CHUNK_DOWNLOAD_WORKERS = 8
+
+# Number of chunks uploaded concurrently when uploading a file
+CHUNK_UPLOAD_WORKERS = 8
+
+# Number of times sending a chunk is attempted before the upload fails, and delay, in
+# seconds, before the first retry. The delay doubles with each retry.
+CHUNK_UPLOAD_ATTEMPTS = 5
+CHUNK_UPLOAD_RETRY_DELAY = 1.0
+
+# Number of transactions whose metadata is cached by `file_exists`
+TX_METADATA_CACHE_SIZE = 1024
+
+# GraphQL query for the owner, data size & tags of the transaction with id `$id`
+TX_METADATA_QUERY = """
+    query($id: ID!) {
+        transaction(id: $id) {
+            owner {
+                address
+            }
+            data {
+                size
+                type
+            }
+            tags {
+                name
+                value
+            }
+        }
+    }
+"""
+
 
 class FileNotReadyException(Exception):
     """Exception raised when a file is not ready for download from Arweave."""
@@ -51,6 +103,11 @@ class FileManager:
         self.peer = Peer(self.api_url)
         self.wallet_path = wallet_path
         self.logger = logger
+        # transactions are immutable, so their metadata is cached. Failed queries
+        # (i.e. for transactions that are not mined yet) raise, and are not cached.
+        self._tx_metadata = lru_cache(maxsize=TX_METADATA_CACHE_SIZE)(
+            self._query_tx_metadata
+        )
 
     @property
     def wallet(self) -> Wallet:
@@ -77,26 +134,24 @@ class FileManager:
             FileNotReadyException: If the file is pending and not ready for download.
         """
         # Check if the file is pending
-        r = requests.get(f"{self.api_url}/tx/{txid}")
+        r = self.peer.session.get(f"{self.api_url}/tx/{txid}")
         if r.status_code == 202:
             self.logger(f"file with txid {txid} is pending")
             raise FileNotReadyException(
                 f"File with txid {txid} is pending. It has not reached finality yet."
             )
 
-        loaded_bytes = 0
-
         with open(pathname, "wb") as binary_file:
             try:
                 # Try downloading the transaction data directly from the default data
-                # endpoint
-                data = self.peer.data(txid)
-
-                # Write downloaded file to disk
-                binary_file.write(data)
+                # endpoint, streaming it to disk
+                self._stream_to_file(binary_file, txid)
 
                 return os.path.abspath(pathname)
             except Exception:
+                # discard whatever was written before the download failed
+                binary_file.seek(0)
+                binary_file.truncate()
                 self.logger(
                     f"failed to download transaction data for {txid} directly."
                     + " Will try downloading in chunks."
@@ -124,24 +179,87 @@ class FileManager:
                 # just download the file to disk via the tx_data endpoint
                 # which purportedly downloads files regardless of how it
                 # was uploaded (but has this size limitation)
-                data = self.peer.tx_data(txid)
-                binary_file.write(data)
+                self._stream_to_file(binary_file, "tx", txid, "data.")
             else:
-                with tqdm(total=size) as pbar:
-                    while loaded_bytes < size:
-                        # Download this chunk
-                        chunkData = self.peer.chunk(startOffset + loaded_bytes)["chunk"]
-                        # Arweave files use b64 encoding. We decode the chunk here
-                        chunkDataDec = b64dec(chunkData)
-                        # Write the part of the file to disk
-                        binary_file.write(chunkDataDec)
-                        # Update offset to subtract from file size
-                        loaded_bytes += len(chunkDataDec)
-                        # Update progress bar
-                        pbar.update(len(chunkDataDec))
+                self._download_chunks(binary_file, startOffset, size)
 
             return os.path.abspath(pathname)
 
+    def _download_chunk(self, offset: int) -> bytes:
+        """
+        Download the chunk containing the given (absolute) offset.
+
+        Args:
+            offset (int): The offset to download the chunk of.
+
+        Returns:
+            bytes: The chunk's data.
+        """
+        # Arweave files use b64 encoding. We decode the chunk here
+        return b64dec(self.peer.chunk(offset)["chunk"])  # type: ignore
+
+    def _download_chunks(
+        self, binary_file: BinaryIO, start_offset: int, size: int
+    ) -> None:
+        """
+        Download a transaction's data chunk by chunk, and write it to a file.
+
+        Chunks are independent of each other, so the next few are prefetched
+        concurrently while the current one is written. Prefetches are made at
+        multiples of the (maximum) chunk size, which is where chunks start for
+        all but the last two chunks of a transaction. A prefetched chunk is only
+        used if it was requested at exactly the offset the file has been written
+        up to, otherwise that offset is fetched instead.
+
+        Args:
+            binary_file (BinaryIO): The file to write to.
+            start_offset (int): The absolute offset of the transaction's first byte.
+            size (int): The size of the transaction's data.
+        """
+        pending: dict[int, Future[bytes]] = {}
+        loaded_bytes = 0
+
+        with ThreadPoolExecutor(max_workers=CHUNK_DOWNLOAD_WORKERS) as executor, tqdm(
+            total=size
+        ) as pbar:
+            while loaded_bytes < size:
+                # Keep the next few chunks in flight, starting with the current one
+                offset = loaded_bytes
+                while offset < size and (
+                    offset == loaded_bytes or len(pending) < CHUNK_DOWNLOAD_WORKERS
+                ):
+                    if offset not in pending:
+                        pending[offset] = executor.submit(
+                            self._download_chunk, start_offset + offset
+                        )
+                    offset += ARWEAVE_CHUNK_SIZE
+
+                chunk = pending.pop(loaded_bytes).result()
+                # Write the part of the file to disk
+                binary_file.write(chunk)
+                # Update offset to subtract from file size
+                loaded_bytes += len(chunk)
+                # Update progress bar
+                pbar.update(len(chunk))
+
+                # Drop prefetches that turned out not to start a chunk
+                for stale in [o for o in pending if o < loaded_bytes]:
+                    pending.pop(stale).cancel()
+
+    def _stream_to_file(self, binary_file: BinaryIO, *path: str) -> None:
+        """
+        Stream the response of a GET request to the peer into a file, so that only
+        one chunk is held in memory at a time. Goes through the peer's request
+        handling, so rate limiting & retries behave like with `Peer.data()`.
+
+        Args:
+            binary_file (BinaryIO): The file to write to.
+            *path (str): The path segments of the endpoint to download from.
+        """
+        with self.peer._get(*path, stream=True) as response:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                binary_file.write(chunk)
+
     def upload(self, file_path: Path, tags_dict: dict[str, str]) -> Transaction:
         """
         Upload a file to Arweave with the given tags.
@@ -167,18 +285,96 @@ class FileManager:
 
             tx.sign()
 
-            # Uploader required to upload in chunks
+            # Uploader required to post the transaction
             uploader = get_uploader(tx, file_handler)
             # Manually update tqdm progress bar to total chunks
             with tqdm(total=uploader.total_chunks) as pbar:
-                while not uploader.is_complete:
-                    # Upload a chunk
+                # Post the transaction, along with its first chunk
+                while not uploader.is_complete and uploader.uploaded_chunks == 0:
                     uploader.upload_chunk()
-                    # Increment progress bar by 1 chunk
-                    pbar.update(1)
+                pbar.update(uploader.uploaded_chunks)
+
+                self._upload_chunks(
+                    tx, uploader.uploaded_chunks, uploader.total_chunks, pbar
+                )
 
         return tx
 
+    def _upload_chunks(self, tx: Transaction, start: int, end: int, pbar: tqdm) -> None:
+        """
+        Upload the data chunks of a posted transaction.
+
+        Chunks are independent of each other, so they are uploaded concurrently.
+        Reading a chunk seeks the transaction's file handler, so chunks are read
+        here, in order, and only their upload is done by the worker threads. At
+        most twice as many chunks as there are workers are held in memory.
+
+        Unlike the uploader, which retries a chunk until it succeeds, this fails
+        fast: a chunk that can't be sent after `CHUNK_UPLOAD_ATTEMPTS` attempts, or
+        that is rejected, raises, and the chunks not sent yet are dropped. The
+        transaction is then left partially uploaded.
+
+        Args:
+            tx (Transaction): The posted transaction.
+            start (int): Index of the first chunk to upload.
+            end (int): Index past the last chunk to upload.
+            pbar (tqdm): Progress bar, incremented by 1 for each uploaded chunk.
+
+        Raises:
+            TransactionUploaderException: If a chunk's inclusion proof is invalid.
+            ArweaveException: If a chunk is rejected, or can't be sent.
+        """
+        pending: deque[Future[str]] = deque()
+
+        with ThreadPoolExecutor(max_workers=CHUNK_UPLOAD_WORKERS) as executor:
+            try:
+                for idx in range(start, end):
+                    if len(pending) == 2 * CHUNK_UPLOAD_WORKERS:
+                        pending.popleft().result()
+                        pbar.update(1)
+                    pending.append(
+                        executor.submit(self._send_chunk, idx, tx.get_chunk(idx))
+                    )
+
+                while pending:
+                    pending.popleft().result()
+                    pbar.update(1)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+    def _send_chunk(self, idx: int, chunk: dict[str, Any]) -> str:
+        """
+        Validate a chunk's inclusion proof, as the uploader does, then send it to
+        the peer. Network errors are retried, with an exponential backoff; chunks
+        the peer rejects (400s) are not.
+
+        Args:
+            idx (int): Index of the chunk, for error messages.
+            chunk (dict[str, Any]): The chunk, as returned by `Transaction.get_chunk`.
+
+        Returns:
+            str: The peer's response.
+        """
+        if not validate_path(
+            b64dec(chunk["data_root"]),
+            int(chunk["offset"]),
+            0,
+            int(chunk["data_size"]),
+            b64dec(chunk["data_path"]),
+        ):
+            raise TransactionUploaderException(f"Unable to validate chunk {idx}")
+
+        for attempt in range(CHUNK_UPLOAD_ATTEMPTS - 1):
+            try:
+                return str(self.peer.send_chunk(chunk))
+            except ArweaveNetworkException as e:
+                delay = CHUNK_UPLOAD_RETRY_DELAY * 2**attempt
+                self.logger(f"failed to send chunk {idx}: {e}, retrying in {delay}s")
+                time.sleep(delay)
+        return str(self.peer.send_chunk(chunk))
+
     def file_exists(self, file_path: str, txid: str) -> bool:
         """
         Given a local file path and a transaction ID, check if the file exists on
@@ -194,35 +390,6 @@ class FileManager:
         Returns:
             bool: True if the file exists and matches the transaction, False otherwise.
         """
-        query_str = (
-            """
-                query {
-                    transaction(
-                    id: "%s"
-                    )
-                    {
-                        owner{
-                            address
-                        }
-                        data{
-                            size
-                            type
-                        }
-                        tags{
-                            name
-                            value
-                        }
-                    }
-                }
-            """
-            % txid
-        )
-
-        res = self.peer.graphql(query_str)
-
-        tx_file_size: int = int(res["data"]["transaction"]["data"]["size"])
-        tx_tags: dict[str, str] = get_tags_dict(res["data"]["transaction"]["tags"])
-
         local_file_exists, size_matches, digest_matches = (
             False,
             False,
@@ -236,12 +403,15 @@ class FileManager:
                 f"size_matches={size_matches} digest_matches={digest_matches}",
             )
 
+        # local checks first, a missing local file needs no round-trip to Arweave
         local_file_exists = os.path.exists(file_path)
 
         if not local_file_exists:
             _log()
             return False
 
+        tx_file_size, tx_tags = self._tx_metadata(txid)
+
         size_matches = tx_file_size == os.path.getsize(file_path)
 
         if not size_matches:
@@ -251,3 +421,22 @@ class FileManager:
         digest_matches = tx_tags.get("File-SHA256") == get_sha256_digest(file_path)
         _log()
         return digest_matches
+
+    def _query_tx_metadata(self, txid: str) -> tuple[int, dict[str, str]]:
+        """
+        Query the data size and tags of a transaction.
+
+        Args:
+            txid (str): The transaction ID.
+
+        Returns:
+            tuple[int, dict[str, str]]: The transaction's data size and tags.
+        """
+        # the txid is passed as a variable, so that the query itself is constant
+        res = self.peer._post_json(
+            {"query": TX_METADATA_QUERY, "variables": {"id": txid}}, "graphql"
+        )
+
+        tx_file_size: int = int(res["data"]["transaction"]["data"]["size"])
+        tx_tags: dict[str, str] = get_tags_dict(res["data"]["transaction"]["tags"])
+        return tx_file_size, tx_tags
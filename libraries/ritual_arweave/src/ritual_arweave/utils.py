@@ -5,6 +5,7 @@ Utility functions for the Arweave integration.
 import hashlib
 import logging
 import os
+import sys
 from typing import Any, Optional
 
 from ar import DEFAULT_API_URL, Wallet  # type: ignore
@@ -14,6 +15,9 @@ from ar import DEFAULT_API_URL, Wallet  # type: ignore
 # we take lower to be conservative
 MAX_NODE_BYTES = 1e7
 
+# Block size used to hash files on python versions without hashlib.file_digest
+HASH_BLOCK_SIZE = 16 * 1024 * 1024
+
 log = logging.getLogger(__name__)
 
 
@@ -62,17 +66,18 @@ def get_sha256_digest(file_path: str) -> str:
     Returns:
         str: hex string representing the sha256
     """
-    h = hashlib.sha256()
-
     with open(file_path, "rb") as file:
-        while True:
-            # Reading is buffered, so we can read smaller chunks.
-            chunk = file.read(h.block_size)
-            if not chunk:
-                break
-            h.update(chunk)
-
-    return h.hexdigest()
+        if sys.version_info >= (3, 11):
+            # reads straight into a buffer, hashing without holding the GIL
+            return hashlib.file_digest(file, "sha256").hexdigest()
+
+        h = hashlib.sha256()
+        # hash in large blocks: per-block overhead dominates with small ones
+        buffer = bytearray(HASH_BLOCK_SIZE)
+        view = memoryview(buffer)
+        while n := file.readinto(buffer):
+            h.update(view[:n])
+        return h.hexdigest()
 
 
 def load_wallet(
@@ -0,0 +1,264 @@
+import base64
+import io
+import os
+import threading
+from collections import Counter
+from typing import Any, Generator, Optional
+
+import pytest
+from ar import ArweaveException, ArweaveNetworkException  # type: ignore
+from ar.utils import b64enc  # type: ignore
+from ar.utils.merkle import generate_transaction_chunks  # type: ignore
+from ar.utils.transaction_uploader import TransactionUploaderException  # type: ignore
+from ritual_arweave import file_manager
+from ritual_arweave.file_manager import (
+    ARWEAVE_CHUNK_SIZE,
+    CHUNK_UPLOAD_ATTEMPTS,
+    FileManager,
+)
+
+# absolute offset of the first byte of the fake transactions' data
+START_OFFSET = 1000
+
+
+@pytest.fixture(autouse=True, scope="session")
+def arweave_node() -> Generator[None, None, None]:
+    # these tests use fake peers, no need to start a local arweave node
+    yield
+
+
+def _arweave_chunk_sizes(size: int) -> list[int]:
+    """
+    Sizes of the chunks Arweave splits data of the given size into: 256KiB chunks,
+    except for the last two which are rebalanced so that the last one isn't tiny.
+    """
+    min_chunk_size = 32 * 1024
+    sizes, rest = [], size
+    while rest >= ARWEAVE_CHUNK_SIZE:
+        chunk_size = ARWEAVE_CHUNK_SIZE
+        if 0 < rest - ARWEAVE_CHUNK_SIZE < min_chunk_size:
+            chunk_size = -(-rest // 2)
+        sizes.append(chunk_size)
+        rest -= chunk_size
+    if rest:
+        sizes.append(rest)
+    return sizes
+
+
+class FakeDownloadPeer:
+    """
+    Serves the chunks of some data, mimicking `Peer.chunk()`.
+    """
+
+    def __init__(
+        self, data: bytes, chunk_sizes: list[int], fail_at: Optional[int] = None
+    ):
+        self.data = data
+        self.fail_at = fail_at
+        self.bounds = []
+        start = 0
+        for chunk_size in chunk_sizes:
+            self.bounds.append((start, start + chunk_size))
+            start += chunk_size
+        self.requested: list[int] = []
+        self.lock = threading.Lock()
+
+    def chunk(self, offset: int) -> dict[str, Any]:
+        relative = offset - START_OFFSET
+        with self.lock:
+            self.requested.append(relative)
+        if relative == self.fail_at:
+            raise ConnectionError(f"failed to fetch chunk at {offset}")
+        for start, end in self.bounds:
+            if start <= relative < end:
+                chunk = base64.urlsafe_b64encode(self.data[start:end])
+                return {"chunk": chunk.decode().rstrip("=")}
+        raise ValueError(f"offset out of range: {offset}")
+
+
+def _file_manager(peer: Any) -> FileManager:
+    fm = FileManager(logger=lambda _: None)
+    fm.peer = peer
+    return fm
+
+
+@pytest.mark.parametrize(
+    "size, chunk_sizes",
+    [
+        # a single, partial chunk
+        (500, None),
+        # whole chunks only
+        (ARWEAVE_CHUNK_SIZE * 7, None),
+        # last two chunks rebalanced, i.e. not starting at multiples of 256KiB
+        (ARWEAVE_CHUNK_SIZE * 10 + 5000, None),
+        # no chunk past the first one starts where it is prefetched
+        (3_000_001, [100_000] * 30 + [1]),
+    ],
+)
+def test_download_chunks(size: int, chunk_sizes: Optional[list[int]]) -> None:
+    data = os.urandom(size)
+    chunk_sizes = chunk_sizes or _arweave_chunk_sizes(size)
+    peer = FakeDownloadPeer(data, chunk_sizes)
+
+    out = io.BytesIO()
+    _file_manager(peer)._download_chunks(out, START_OFFSET, size)
+
+    assert out.getvalue() == data
+    # every chunk was fetched at the offset it starts at
+    chunk_starts = {start for start, _ in peer.bounds}
+    assert chunk_starts <= set(peer.requested)
+
+
+def test_download_chunks_should_raise_if_a_chunk_fails() -> None:
+    size = ARWEAVE_CHUNK_SIZE * 20
+    peer = FakeDownloadPeer(
+        os.urandom(size),
+        _arweave_chunk_sizes(size),
+        fail_at=ARWEAVE_CHUNK_SIZE * 5,
+    )
+
+    out = io.BytesIO()
+    with pytest.raises(ConnectionError):
+        _file_manager(peer)._download_chunks(out, START_OFFSET, size)
+
+    # the chunks before the failing one were written
+    assert len(out.getvalue()) == ARWEAVE_CHUNK_SIZE * 5
+
+
+class FakeUploadTransaction:
+    """
+    Serves the chunks of random data by index, mimicking `Transaction.get_chunk()`.
+    """
+
+    def __init__(self, num_chunks: int, corrupt_at: Optional[int] = None):
+        data = os.urandom(num_chunks * ARWEAVE_CHUNK_SIZE)
+        self.file_handler = io.BytesIO(data)
+        self.data_size = len(data)
+        self.chunks = generate_transaction_chunks(self.file_handler)
+        self.data_root = self.chunks["data_root"]
+        self.corrupt_at = corrupt_at
+        self.reader_threads: set[threading.Thread] = set()
+
+    def offset(self, idx: int) -> str:
+        return str(self.chunks["proofs"][idx].offset)
+
+    def get_chunk(self, idx: int) -> dict[str, Any]:
+        self.reader_threads.add(threading.current_thread())
+        proof = self.chunks["proofs"][idx]
+        chunk = self.chunks["chunks"][idx]
+        self.file_handler.seek(chunk.min_byte_range)
+        data_path = proof.proof
+        if idx == self.corrupt_at:
+            data_path = bytes(len(data_path))
+        return {
+            "data_root": self.data_root,
+            "data_size": str(self.data_size),
+            "data_path": b64enc(data_path),
+            "offset": str(proof.offset),
+            "chunk": b64enc(self.file_handler.read(chunk.data_size)),
+        }
+
+
+class FakeUploadPeer:
+    """
+    Records the chunks it is sent, by offset, mimicking `Peer.send_chunk()`. The
+    chunk at `fail_at` fails `failures` times with `error`.
+    """
+
+    def __init__(
+        self,
+        fail_at: Optional[str] = None,
+        failures: int = 0,
+        error: type[Exception] = ArweaveNetworkException,
+    ):
+        self.fail_at = fail_at
+        self.failures = failures
+        self.error = error
+        self.attempts: Counter[str] = Counter()
+        self.sent: list[str] = []
+        self.lock = threading.Lock()
+
+    def send_chunk(self, chunk: dict[str, Any]) -> str:
+        offset = chunk["offset"]
+        with self.lock:
+            self.attempts[offset] += 1
+            if offset == self.fail_at and self.attempts[offset] <= self.failures:
+                raise self.error(f"failed to send chunk at {offset}")
+            self.sent.append(offset)
+        return "OK"
+
+
+class FakeProgressBar:
+    def __init__(self) -> None:
+        self.n = 0
+
+    def update(self, n: int) -> None:
+        self.n += n
+
+
+@pytest.fixture
+def no_retry_delay(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(file_manager, "CHUNK_UPLOAD_RETRY_DELAY", 0)
+
+
+@pytest.mark.parametrize("start, end", [(0, 1), (0, 40), (3, 20)])
+def test_upload_chunks(start: int, end: int) -> None:
+    tx, peer, pbar = FakeUploadTransaction(40), FakeUploadPeer(), FakeProgressBar()
+
+    _file_manager(peer)._upload_chunks(tx, start, end, pbar)
+
+    # every chunk was sent exactly once
+    assert sorted(peer.sent) == sorted(tx.offset(idx) for idx in range(start, end))
+    assert pbar.n == end - start
+    # chunks are only read on the calling thread, as that seeks the file handler
+    assert tx.reader_threads == {threading.current_thread()}
+
+
+@pytest.mark.usefixtures("no_retry_delay")
+def test_upload_chunks_should_retry_network_errors() -> None:
+    tx, pbar = FakeUploadTransaction(20), FakeProgressBar()
+    peer = FakeUploadPeer(tx.offset(5), failures=CHUNK_UPLOAD_ATTEMPTS - 1)
+
+    _file_manager(peer)._upload_chunks(tx, 0, 20, pbar)
+
+    assert sorted(peer.sent) == sorted(tx.offset(idx) for idx in range(20))
+    assert peer.attempts[tx.offset(5)] == CHUNK_UPLOAD_ATTEMPTS
+    assert pbar.n == 20
+
+
+@pytest.mark.usefixtures("no_retry_delay")
+def test_upload_chunks_should_raise_if_a_chunk_keeps_failing() -> None:
+    tx, pbar = FakeUploadTransaction(20), FakeProgressBar()
+    peer = FakeUploadPeer(tx.offset(5), failures=CHUNK_UPLOAD_ATTEMPTS)
+
+    with pytest.raises(ArweaveNetworkException):
+        _file_manager(peer)._upload_chunks(tx, 0, 20, pbar)
+
+    assert tx.offset(5) not in peer.sent
+    assert peer.attempts[tx.offset(5)] == CHUNK_UPLOAD_ATTEMPTS
+    # the failing chunk isn't counted as uploaded
+    assert pbar.n < 20
+
+
+def test_upload_chunks_should_not_retry_rejected_chunks() -> None:
+    tx, pbar = FakeUploadTransaction(20), FakeProgressBar()
+    peer = FakeUploadPeer(tx.offset(5), failures=1, error=ArweaveException)
+
+    with pytest.raises(ArweaveException):
+        _file_manager(peer)._upload_chunks(tx, 0, 20, pbar)
+
+    assert peer.attempts[tx.offset(5)] == 1
+    assert tx.offset(5) not in peer.sent
+
+
+def test_upload_chunks_should_validate_chunks() -> None:
+    tx, peer, pbar = (
+        FakeUploadTransaction(20, corrupt_at=5),
+        FakeUploadPeer(),
+        FakeProgressBar(),
+    )
+
+    with pytest.raises(TransactionUploaderException, match="chunk 5"):
+        _file_manager(peer)._upload_chunks(tx, 0, 20, pbar)
+
+    assert tx.offset(5) not in peer.attempts